@@ -1,7 +1,13 @@
 from src.core.analyzer import ContentAnalyzer
 from typing import List, Dict, Any, Optional
+import asyncio
+import atexit
 import logging
+import logging.handlers
+import multiprocessing
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 from pydantic import HttpUrl # Added for type hint consistency
 
 logger = logging.getLogger("web_analyzer_api.integration")
@@ -17,6 +23,63 @@ except Exception as e:
     logger.error(f"Failed to initialize ContentAnalyzer in integration module: {e}", exc_info=True)
     analyzer = None # Set to None to indicate failure
 
+# Optional worker processes for the analysis, off by default (ANALYZER_WORKERS=0 analyzes in-process):
+# for a single request, shipping content and results between processes costs more than the analysis.
+# Workers are started with forkserver/spawn rather than fork, so they don't inherit the API's queued
+# root log handler (its listener thread only runs in the parent); each builds its own module-level
+# analyzer on import, and its log records are sent back to the parent's loggers over a queue.
+ANALYZER_WORKERS = int(os.getenv("ANALYZER_WORKERS", "0"))
+_process_pool: Optional[ProcessPoolExecutor] = None
+_worker_log_listener: Optional[logging.handlers.QueueListener] = None
+
+class _WorkerLogForwarder(logging.Handler):
+    """Hands log records from pool workers to the parent's logger of the same name."""
+    def emit(self, record: logging.LogRecord) -> None:
+        logging.getLogger(record.name).handle(record)
+
+def _init_worker_logging(log_queue, log_level: int) -> None:
+    """Pool worker initializer: send all of this process's log records to the parent over log_queue."""
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    root_logger.setLevel(log_level)
+
+def _get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """Create the analysis worker pool on first use; None when in-process analysis is configured."""
+    global _process_pool, _worker_log_listener
+    if _process_pool is None and ANALYZER_WORKERS > 0:
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        mp_context = multiprocessing.get_context(start_method)
+        logger.info(f"Starting analysis process pool with {ANALYZER_WORKERS} workers ({start_method}).")
+        log_queue = mp_context.Queue()
+        _worker_log_listener = logging.handlers.QueueListener(log_queue, _WorkerLogForwarder())
+        _worker_log_listener.start()
+        _process_pool = ProcessPoolExecutor(
+            max_workers=ANALYZER_WORKERS,
+            mp_context=mp_context,
+            initializer=_init_worker_logging,
+            initargs=(log_queue, logging.getLogger().getEffectiveLevel()),
+        )
+        atexit.register(_shutdown_process_pool)
+    return _process_pool
+
+def _shutdown_process_pool() -> None:
+    """Stop the workers, then the listener once their last log records are handled."""
+    global _process_pool, _worker_log_listener
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True)
+        _process_pool = None
+    if _worker_log_listener is not None:
+        _worker_log_listener.stop()
+        _worker_log_listener = None
+
+def _worker_analyze(content: str, title: str, target_urls: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """Run the analysis inside a pool worker using that process's analyzer."""
+    if analyzer is None:
+        raise RuntimeError("ContentAnalyzer failed to initialize in worker process")
+    return analyzer.analyze_content(content, title, target_urls)
+
 async def analyze_content_task(content: str, title: str, site_id: str = None, url: Optional[HttpUrl] = None) -> Dict[str, Any]:
     """
     Process content analysis using the simple ContentAnalyzer.
@@ -43,7 +106,12 @@ async def analyze_content_task(content: str, title: str, site_id: str = None, ur
     try:
         # Run the analysis - Simple analyzer doesn't technically need target URLs for its logic,
         # but the current method signature requires it. Pass an empty list.
-        opportunities = analyzer.analyze_content(content, title, [])
+        process_pool = _get_process_pool()
+        if process_pool is not None:
+            loop = asyncio.get_running_loop()
+            opportunities = await loop.run_in_executor(process_pool, _worker_analyze, content, title, [])
+        else:
+            opportunities = analyzer.analyze_content(content, title, [])
 
         # Convert to API response format
         link_suggestions = []
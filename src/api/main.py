@@ -1,7 +1,10 @@
 # src/api/main.py
 
+import atexit
 import logging.config
+import logging.handlers
 import os
+import queue
 from typing import List, Optional
 from datetime import datetime
 # --- REMOVE NLTK import and path config block ---
@@ -42,6 +45,19 @@ if os.path.exists(log_config_path):
 else:
     logging.basicConfig(level=logging.INFO) # Basic config if file not found
 
+# Route root handlers through a queue so handler IO (file/stream writes) runs on a
+# listener thread instead of blocking the request coroutine.
+_root_logger = logging.getLogger()
+_log_handlers = [h for h in _root_logger.handlers if not isinstance(h, logging.handlers.QueueHandler)]
+if _log_handlers:
+    _log_queue = queue.SimpleQueue()
+    _log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)
+    for _handler in _log_handlers:
+        _root_logger.removeHandler(_handler)
+    _root_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+
 logger = logging.getLogger("web_analyzer_api") # Get logger after basicConfig/fileConfig
 
 # Create FastAPI app instance
@@ -99,7 +115,7 @@ async def analyze_content_simple(
     """
     Analyze content using the simple analyzer (topic weights).
     """
-    logger.info(f"Received simple analysis request for site: {site_info.get('site_id', 'N/A')}")
+    logger.info("Received simple analysis request for site: %s", site_info.get('site_id', 'N/A'))
     # Note: site_id from site_info is currently NOT used by analyzer_integration.analyze_content_task
     result = await analyzer_integration.analyze_content_task(
             content=request.content,
@@ -130,7 +146,7 @@ async def analyze_content_enhanced(
          # Should not happen if get_site_from_api_key worked, but defensive check
          raise HTTPException(status_code=401, detail="Could not determine site ID from API Key.")
 
-    logger.info(f"Received enhanced analysis request for site: {site_id}")
+    logger.info("Received enhanced analysis request for site: %s", site_id)
     # Pass site_id; analyzer_integration now handles calling EnhancedContentAnalyzer correctly
     result = await enhanced_integration.analyze_content_enhanced(
             content=request.content,
@@ -146,6 +162,24 @@ async def analyze_content_enhanced(
 
 # --- Bulk Processing Endpoints ---
 
+async def verify_job_owner(
+    job_id: str,
+    site_info: dict = Depends(auth.check_rate_limit)
+) -> dict:
+    """
+    Look up a bulk job and ensure it belongs to the site making the request.
+    Returns the job status dict so endpoints don't need to fetch it again.
+    """
+    job_info = bulk_integration.get_job_status(job_id)
+
+    if job_info.get("status") == "not_found":
+        raise HTTPException(status_code=404, detail=job_info.get("error", "Job not found"))
+    if job_info.get("site_id") != site_info.get("site_id"):
+        raise HTTPException(status_code=403, detail="Job does not belong to your site.")
+
+    return job_info
+
+
 @app.post(f"{api_v1_prefix}/bulk/process",
           response_model=schemas.JobSubmissionResponse,
           status_code=202, # Accepted
@@ -164,7 +198,8 @@ async def start_bulk_job(
     if not site_id:
          raise HTTPException(status_code=401, detail="Could not determine site ID from API Key.")
 
-    logger.info(f"Received bulk processing request for site: {site_id}, items: {len(bulk_request.content_items)}, knowledge_building: {bulk_request.knowledge_building}")
+    logger.info("Received bulk processing request for site: %s, items: %d, knowledge_building: %s",
+                site_id, len(bulk_request.content_items), bulk_request.knowledge_building)
 
     if not bulk_request.content_items:
          raise HTTPException(status_code=400, detail="No content items provided for bulk processing.")
@@ -191,22 +226,13 @@ async def start_bulk_job(
          tags=["Bulk Processing"])
 async def get_bulk_job_status(
     job_id: str,
-    site_info: dict = Depends(auth.get_site_from_api_key) # Ensure user can only query jobs for their site? Maybe later.
+    job_info: dict = Depends(verify_job_owner) # 404/403 handled by the dependency
 ):
     """
     Get the status of a specific bulk processing job.
     """
-    logger.debug(f"Request for job status: {job_id}, requesting site: {site_info.get('site_id')}")
-    status_info = bulk_integration.get_job_status(job_id)
-
-    # Optional: Add check here to ensure the site_id from site_info matches the job's site_id for security
-    # if not status_info.get("status") == "not_found" and status_info.get("site_id") != site_info.get("site_id"):
-    #     raise HTTPException(status_code=404, detail="Job ID not found for your site.")
-
-    if status_info.get("status") == "not_found":
-        raise HTTPException(status_code=404, detail=status_info.get("error", "Job not found"))
-
-    return status_info
+    logger.debug("Request for job status: %s, site: %s", job_id, job_info.get('site_id'))
+    return job_info
 
 
 @app.post(f"{api_v1_prefix}/bulk/stop/{{job_id}}",
@@ -215,13 +241,12 @@ async def get_bulk_job_status(
           tags=["Bulk Processing"])
 async def stop_bulk_job(
     job_id: str,
-    site_info: dict = Depends(auth.get_site_from_api_key) # Add security check?
+    job_info: dict = Depends(verify_job_owner) # 404/403 handled by the dependency
 ):
     """
     Request to stop a running bulk processing job.
     """
-    logger.info(f"Received request to stop job: {job_id}, requesting site: {site_info.get('site_id')}")
-    # Optional: Add site_id check for security
+    logger.info("Received request to stop job: %s, site: %s", job_id, job_info.get('site_id'))
     stop_info = bulk_integration.stop_job(job_id)
 
     if stop_info.get("status") == "not_found":
@@ -246,7 +271,7 @@ async def list_bulk_jobs(
     if not site_id:
         raise HTTPException(status_code=401, detail="Could not determine site ID from API Key.")
 
-    logger.debug(f"Request to list jobs for site: {site_id}")
+    logger.debug("Request to list jobs for site: %s", site_id)
     # Filter jobs by site_id in the integration layer
     jobs = bulk_integration.list_jobs(site_id=site_id)
     return jobs
@@ -267,7 +292,7 @@ async def get_kb_stats(
     if not site_id:
          raise HTTPException(status_code=401, detail="Could not determine site ID from API Key.")
 
-    logger.debug(f"Request for KB stats for site: {site_id}")
+    logger.debug("Request for KB stats for site: %s", site_id)
     try:
         # Consider if KB instance should be shared/cached or created per request
         kb = KnowledgeDatabase(site_id=site_id)
@@ -275,12 +300,12 @@ async def get_kb_stats(
         if not stats:
              # Return empty stats object or 404? Let's return empty for now
              # Use default values from Pydantic model if possible, or return empty dict
-              logger.warning(f"Knowledge base for site {site_id} returned empty stats.")
+              logger.warning("Knowledge base for site %s returned empty stats.", site_id)
               # Raise 404 instead?
               raise HTTPException(status_code=404, detail=f"Could not retrieve stats for site {site_id}. KB might be empty.")
         return stats
     except Exception as e:
-        logger.error(f"Error getting KB stats for site {site_id}: {e}", exc_info=True)
+        logger.error("Error getting KB stats for site %s: %s", site_id, e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to retrieve knowledge base statistics.")
 
 # Add more endpoints as needed (e.g., delete KB entry, query specific entry)
@@ -1,10 +1,34 @@
 import os
 import json
+import hashlib
+import heapq
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+import pickle
+import tempfile
+import time
+from collections import OrderedDict
+from functools import cached_property
+from operator import itemgetter
+from typing import List, Dict, Any, FrozenSet, NamedTuple, Optional, Set, Tuple
 import re
-from datetime import datetime
 import yaml
+import numpy as np
+
+# Prefer PyYAML's LibYAML-backed loader; fall back to the pure-Python one if it isn't compiled in
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+try:
+    import ahocorasick # pyahocorasick: single-pass multi-term matching
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson # Faster JSON parsing for the app config
+except ImportError:
+    orjson = None
 
 # Configure logging
 logger = logging.getLogger("web_analyzer.analyzer")
@@ -12,6 +36,60 @@ logger = logging.getLogger("web_analyzer.analyzer")
 # Define config directory relative to this file's location (assuming analyzer.py is in src/core)
 CONFIG_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'config')
 
+# Tokens for title-phrase matching: runs of word characters (group 1) and single punctuation
+# characters, so hyphens and apostrophes split words just like a \b-delimited search sees them
+_PHRASE_TOKEN_RE = re.compile(r"(\w+)|[^\w\s]")
+_TITLE_PHRASE_LENGTHS = (2, 3, 4)
+
+# Paragraph separator: two or more newlines
+_PARAGRAPH_SPLIT_RE = re.compile(r'\n{2,}')
+
+# Max target titles whose precomputed topic data is kept between analyze_content calls
+_TARGET_CACHE_SIZE = 2048
+
+# Max analyze_content results kept for repeated (content, title, target_urls) payloads
+_RESULT_CACHE_SIZE = 2000
+
+class TermInfo(NamedTuple):
+    """Precomputed, content-independent metadata for a topic term (keyed by lowercased term)."""
+    word_count: int
+    category: str # First category containing the term
+    weight: float # Weight of that category
+    scores: Dict[str, float] # Original-case term -> best _extract_topics score across categories
+    relevance_bonus: float # Category bonus used by _topic_relevance_weight
+    confidence_bonus: float # Category bonus used by _find_anchor_options
+
+class AnchorOption(NamedTuple):
+    """A candidate anchor for one target within one paragraph."""
+    text: str
+    confidence: float
+    context: str
+    position: int # Character offset of the first match in the paragraph
+
+class Opportunity(NamedTuple):
+    """A link opportunity; converted to a dict (same keys, same order) only for the returned results."""
+    paragraph_index: int
+    target_url: str
+    target_title: str
+    relevance: float
+    anchor_text: str
+    anchor_context: str
+    anchor_confidence: float
+
+# Topic tables and the term automaton are pure functions of the config directory,
+# so build them once per process and share them across analyzer instances.
+# Maps absolute config dir -> (topic_categories, term_info, automaton)
+_topic_index_cache: Dict[str, Tuple[Dict[str, Dict[str, Any]], Dict[str, TermInfo], Any]] = {}
+
+# Optional on-disk copy of the built topic index, used while it is newer than topic_weights.yaml.
+# Off unless TOPIC_INDEX_CACHE_DIR names a directory only this service can write to, since the
+# file is unpickled on startup. Bump the version whenever TermInfo or the index layout changes.
+TOPIC_INDEX_CACHE_DIR = os.getenv("TOPIC_INDEX_CACHE_DIR")
+_TOPIC_INDEX_PICKLE_VERSION = 2
+
+# Parsed app config keyed by (absolute path, mtime), so editing the file still takes effect
+_app_config_cache: Dict[Tuple[str, float], Dict[str, Any]] = {}
+
 class ContentAnalyzer:
     """
     Core content analysis engine that processes text and identifies link opportunities.
@@ -22,16 +100,40 @@ class ContentAnalyzer:
 
     def __init__(self, config_path: str = "config.json", config_dir: str = CONFIG_DIR):
         logger.info("Initializing ContentAnalyzer...") # Log start
-        self.config_dir = config_dir # Assign config_dir FIRST
-        self.config = self._load_app_config(config_path) # THEN load config
-        # Load topic categories from YAML during initialization
-        self.topic_categories = self._init_topic_categories()
-        if not self.topic_categories:
-             logger.error("Failed to load topic categories. Analyzer may not function correctly.")
-             # Provide default empty structure to avoid NoneType errors later
-             self.topic_categories = {}
+        self.config_dir = config_dir
+        self.config_path = config_path
+        # App config and topic tables are loaded lazily on first use (see the properties below),
+        # so constructing an analyzer that never analyzes anything stays cheap
+        # Target title -> precomputed target data (or None if it has no topics), reused across calls
+        self._target_cache: Dict[str, Optional[Tuple[Any, ...]]] = {}
+        # Payload digest -> top opportunities of an earlier analyze_content call, least recently used first
+        self._result_cache: "OrderedDict[bytes, List[Opportunity]]" = OrderedDict()
+        self._result_cache_hits = 0
+        self._result_cache_misses = 0
         logger.info("ContentAnalyzer initialized.") # Log completion
 
+    @cached_property
+    def config(self) -> Dict[str, Any]:
+        """Main application config, loaded on first access."""
+        return self._load_app_config(self.config_path)
+
+    @cached_property
+    def _topic_index(self) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, TermInfo], Any]:
+        """Topic categories, per-term metadata and term automaton, loaded on first access."""
+        return self._load_topic_index()
+
+    @property
+    def topic_categories(self) -> Dict[str, Dict[str, Any]]:
+        return self._topic_index[0]
+
+    @property
+    def _term_info(self) -> Dict[str, TermInfo]:
+        return self._topic_index[1]
+
+    @property
+    def _topic_automaton(self):
+        return self._topic_index[2]
+
     def _load_app_config(self, config_path: str) -> Dict[str, Any]:
         """Load main application configuration from JSON file."""
         try:
@@ -39,11 +141,21 @@ class ContentAnalyzer:
             project_root = os.path.dirname(self.config_dir) # Get parent of config dir
             json_config_path = os.path.join(project_root, config_path)
             if os.path.exists(json_config_path):
-                with open(json_config_path, 'r') as f:
+                cache_key = (os.path.abspath(json_config_path), os.path.getmtime(json_config_path))
+                config_data = _app_config_cache.get(cache_key)
+                if config_data is None:
                     logger.info(f"Loading app config from: {json_config_path}")
-                    config_data = json.load(f)
+                    if orjson is not None:
+                        with open(json_config_path, 'rb') as f:
+                            config_data = orjson.loads(f.read())
+                    else:
+                        with open(json_config_path, 'r') as f:
+                            config_data = json.load(f)
                     logger.debug(f"App config loaded: {config_data}") # Log loaded data at debug level
-                    return config_data
+                    _app_config_cache[cache_key] = config_data
+                else:
+                    logger.debug(f"Using cached app config for {json_config_path}")
+                return dict(config_data) # Shallow copy so instances can't alter the cached dict
             else:
                 logger.warning(f"App config file {json_config_path} not found, using defaults.")
                 # Define essential defaults here
@@ -70,17 +182,22 @@ class ContentAnalyzer:
         filepath = os.path.join(self.config_dir, "topic_weights.yaml")
         logger.debug(f"Attempting to load topic categories from: {filepath}") # Add log
         try:
-            with open(filepath, 'r') as f:
-                categories = yaml.safe_load(f)
+            with open(filepath, 'rb') as f: # Binary stream: the loader detects the encoding itself
+                categories = yaml.load(f, Loader=_YamlLoader)
                 if isinstance(categories, dict):
                     logger.info(f"Successfully loaded {len(categories)} topic categories from {filepath}") # Changed level
                     # Basic validation of structure (optional but recommended)
                     valid_categories = {}
                     for key, value in categories.items():
                         if isinstance(value, dict) and 'terms' in value and isinstance(value['terms'], list) and 'weight' in value and isinstance(value['weight'], (int, float)):
+                            # Validate terms once here so the matching code can assume non-blank strings
+                            terms = [str(t) for t in value['terms'] if t and isinstance(t, (str, int, float)) and str(t).strip()]
+                            if len(terms) != len(value['terms']):
+                                logger.warning(f"Dropped {len(value['terms']) - len(terms)} empty or non-text terms from category '{key}' in {filepath}.")
+                            value['terms'] = terms
                             valid_categories[key] = value
                             # Convert terms to lowercase once during loading
-                            valid_categories[key]['terms_lower'] = {str(t).lower() for t in value['terms'] if t}
+                            valid_categories[key]['terms_lower'] = {t.lower() for t in terms}
                         else:
                             logger.warning(f"Invalid structure or missing keys/types for category '{key}' in {filepath}. Skipping.")
                     return valid_categories
@@ -97,6 +214,154 @@ class ContentAnalyzer:
             logger.error(f"Unexpected error loading {filepath}: {e}. Returning empty dict.")
             return {}
 
+    def _load_topic_index(self) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, TermInfo], Any]:
+        """Return topic categories, per-term metadata and the term automaton, building them on first use."""
+        cache_key = os.path.abspath(self.config_dir)
+        cached = _topic_index_cache.get(cache_key)
+        if cached is not None:
+            logger.debug(f"Using cached topic index for {cache_key}")
+            return cached
+
+        index = self._read_topic_index_pickle()
+        if index is None:
+            topic_categories = self._init_topic_categories()
+            if not topic_categories:
+                 logger.error("Failed to load topic categories. Analyzer may not function correctly.")
+                 # Provide default empty structure to avoid NoneType errors later (not cached, retried next time)
+                 return {}, {}, None
+            # Per-term metadata doesn't depend on the content, so compute it (and the matcher) once
+            term_info = self._build_term_info(topic_categories)
+            index = (topic_categories, term_info, self._build_topic_automaton(term_info))
+            self._write_topic_index_pickle(index)
+        _topic_index_cache[cache_key] = index
+        return index
+
+    def _topic_index_pickle_path(self) -> Optional[str]:
+        """Cache file for this config dir's topic index, or None when the on-disk cache is disabled."""
+        if not TOPIC_INDEX_CACHE_DIR:
+            return None
+        # Several config dirs may share the cache dir, so name the file after this one
+        config_digest = hashlib.blake2b(os.path.abspath(self.config_dir).encode("utf-8"), digest_size=8).hexdigest()
+        return os.path.join(TOPIC_INDEX_CACHE_DIR, f"topic_index_{config_digest}.pkl")
+
+    def _read_topic_index_pickle(self) -> Optional[Tuple[Dict[str, Dict[str, Any]], Dict[str, TermInfo], Any]]:
+        """Load the topic index saved by a previous process, if it is still newer than the YAML."""
+        pickle_path = self._topic_index_pickle_path()
+        if pickle_path is None:
+            return None
+        yaml_path = os.path.join(self.config_dir, "topic_weights.yaml")
+        try:
+            if not os.path.exists(pickle_path) or os.path.getmtime(pickle_path) < os.path.getmtime(yaml_path):
+                return None
+            with open(pickle_path, 'rb') as f:
+                version, has_automaton, index = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable topic index cache {pickle_path}: {e}")
+            return None
+        # Rebuild if the layout changed or pyahocorasick availability differs from when it was saved
+        if version != _TOPIC_INDEX_PICKLE_VERSION or has_automaton != (ahocorasick is not None):
+            logger.info(f"Topic index cache {pickle_path} is out of date; rebuilding.")
+            return None
+        logger.info(f"Loaded topic index from cache: {pickle_path}")
+        return index
+
+    def _write_topic_index_pickle(self, index: Tuple[Dict[str, Dict[str, Any]], Dict[str, TermInfo], Any]) -> None:
+        """Save the built topic index to the cache dir so later processes can skip rebuilding it."""
+        pickle_path = self._topic_index_pickle_path()
+        if pickle_path is None:
+            return
+        try:
+            os.makedirs(TOPIC_INDEX_CACHE_DIR, exist_ok=True)
+            # Write to a temp file and rename, so concurrent workers never read a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=TOPIC_INDEX_CACHE_DIR, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump((_TOPIC_INDEX_PICKLE_VERSION, ahocorasick is not None, index), f,
+                                protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, pickle_path)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+            logger.debug(f"Saved topic index cache to {pickle_path}")
+        except Exception as e:
+            # An unwritable cache dir is fine: the index is simply rebuilt on the next start
+            logger.warning(f"Could not save topic index cache to {pickle_path}: {e}")
+
+    def _build_term_info(self, topic_categories: Dict[str, Dict[str, Any]]) -> Dict[str, TermInfo]:
+        """
+        Precompute scores and category bonuses for every term, keyed by lowercased term.
+        A term listed in several categories takes its bonuses from the first one
+        and its topic score from the best one.
+        """
+        term_info: Dict[str, TermInfo] = {}
+        for category, data in topic_categories.items():
+            weight = data.get('weight', 1.0)
+            # Original case of each term (first listed spelling), used for scoring (better for length calc)
+            original_terms = {}
+            for t in data.get("terms", []):
+                original_terms.setdefault(t.lower(), t)
+            for term_lower in data.get('terms_lower', set()):
+                original_term = original_terms.get(term_lower, term_lower)
+
+                term_length_score = min(1.0, len(original_term) / 25.0)
+                word_count_score = min(1.0, len(original_term.split()) / 5.0)
+                score = (
+                    weight * 0.6 +
+                    word_count_score * 0.3 +
+                    term_length_score * 0.1
+                )
+                info = term_info.get(term_lower)
+                if info is None:
+                    info = TermInfo(
+                        word_count=len(term_lower.split()),
+                        category=category,
+                        weight=weight,
+                        scores={},
+                        relevance_bonus=max(0, (weight - 1.0) * 0.1), # Bonus for weight > 1.0
+                        confidence_bonus=max(0, (weight - 1.0) * 0.05) # Small weight bonus
+                    )
+                    term_info[term_lower] = info
+                info.scores[original_term] = max(score, info.scores.get(original_term, 0))
+        return term_info
+
+    def _build_topic_automaton(self, term_info: Dict[str, TermInfo]):
+        """Build an Aho-Corasick automaton over all topic terms (None if pyahocorasick is unavailable)."""
+        if ahocorasick is None or not term_info:
+            if ahocorasick is None:
+                logger.info("pyahocorasick not installed; falling back to per-term substring scans.")
+            return None
+        automaton = ahocorasick.Automaton()
+        for term_lower in term_info:
+            automaton.add_word(term_lower, term_lower)
+        automaton.make_automaton()
+        return automaton
+
+    def _match_terms(self, text_lower: str) -> Set[str]:
+        """Return the set of lowercased topic terms occurring (as substrings) in text_lower."""
+        if self._topic_automaton is not None:
+            return {term_lower for _, term_lower in self._topic_automaton.iter(text_lower)}
+        return {term_lower for term_lower in self._term_info if term_lower in text_lower}
+
+    def _scan_terms(self, text_lower: str) -> Tuple[Set[str], Optional[Dict[str, Tuple[int, int]]]]:
+        """
+        One automaton pass over text_lower returning both the topic terms occurring in it as substrings
+        (as _match_terms) and, per term, the span of its first whole-word occurrence (as _find_whole_word).
+        Without pyahocorasick the spans are None and callers search per topic instead.
+        """
+        if self._topic_automaton is None:
+            return self._match_terms(text_lower), None
+        matched = set()
+        spans = {}
+        # Hits arrive ordered by end index, so the first valid hit per term is its earliest
+        for end_index, term_lower in self._topic_automaton.iter(text_lower):
+            matched.add(term_lower)
+            if term_lower in spans:
+                continue
+            start = end_index - len(term_lower) + 1
+            if self._has_word_boundaries(text_lower, start, end_index + 1):
+                spans[term_lower] = (start, end_index + 1)
+        return matched, spans
+
     def analyze_content(self, content: str, title: str, target_urls: List[Dict[str, str]]) -> List[Dict[str, Any]]:
         """
         Analyze content and find link opportunities to target URLs.
@@ -110,13 +375,24 @@ class ContentAnalyzer:
             List of link opportunities
         """
         logger.info(f"Starting content analysis for title: '{title}', {len(target_urls)} target URLs.")
-        start_time = datetime.now()
+        start_time = time.perf_counter()
 
         if not self.topic_categories:
              logger.warning("Topic categories not loaded, analysis results might be empty or inaccurate.")
              # Return empty list if config is essential and missing
              return []
 
+        # Identical payloads give identical results, so answer repeats from the result cache
+        cache_key = self._result_cache_key(content, title, target_urls)
+        cached_opportunities = self._result_cache.get(cache_key)
+        if cached_opportunities is not None:
+            self._result_cache.move_to_end(cache_key)
+            self._result_cache_hits += 1
+            logger.info(f"Returning {len(cached_opportunities)} cached link opportunities for title: '{title}' "
+                        f"(result cache hits: {self._result_cache_hits}, misses: {self._result_cache_misses}).")
+            return [opportunity._asdict() for opportunity in cached_opportunities] # Fresh dicts for every caller
+        self._result_cache_misses += 1
+
         # Split content into paragraphs
         paragraphs = self._split_into_paragraphs(content)
         logger.info(f"Split content into {len(paragraphs)} paragraphs.")
@@ -131,44 +407,90 @@ class ContentAnalyzer:
 
         min_para_len = self.config.get("min_paragraph_length", 50)
         min_relevance_threshold = self.config.get("min_relevance", 0.4) # Get threshold from config
+        max_links_per_para = self.config.get("max_links_per_paragraph", 2)
         logger.debug(f"Using min_paragraph_length: {min_para_len}, min_relevance: {min_relevance_threshold}")
+        # Checked once: the per-paragraph/per-target messages below are only formatted when DEBUG is on
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+
+        # Target-only work doesn't depend on the paragraph, so do it once per target
+        precomputed_targets = []
+        for target in target_urls:
+            target_title = target.get("title", "")
+            target_url = target.get("url", "")
+            if not target_url or not target_title:
+                logger.debug(f"Skipping target with missing URL or title: {target}")
+                continue
 
-        for para_idx, paragraph in enumerate(paragraphs):
-            if len(paragraph) < min_para_len:
-                logger.debug(f"Skipping paragraph {para_idx}: too short ({len(paragraph)} chars).")
+            target_data = self._prepare_target(target_title)
+            if target_data is None:
+                logger.debug(f"No topics extracted for target title: '{target_title}'. Skipping relevance check.")
+                continue
+            precomputed_targets.append((target_url, target_title) + target_data)
+
+        # Drop short paragraphs up front, keeping their original indices
+        candidate_paragraphs = [(para_idx, paragraph) for para_idx, paragraph in enumerate(paragraphs)
+                                if len(paragraph) >= min_para_len]
+        logger.debug(f"{len(paragraphs) - len(candidate_paragraphs)} paragraphs skipped as too short (< {min_para_len} chars).")
+
+        # Repeated paragraphs (boilerplate, CTAs, bios) give identical results, so analyze each
+        # distinct text once. Maps paragraph text -> its row in topic_scores
+        unique_rows: Dict[str, int] = {}
+        for _, paragraph in candidate_paragraphs:
+            unique_rows.setdefault(paragraph, len(unique_rows))
+        paragraph_results: Dict[str, List[Opportunity]] = {} # Paragraph text -> its opportunities
+        # Lowercase each distinct paragraph once; shared by topic extraction, relevance and anchors
+        unique_paragraphs_lower = [paragraph.lower() for paragraph in unique_rows]
+
+        # One automaton pass per distinct paragraph yields both its topic terms and the anchor spans
+        paragraph_scans = [self._scan_terms(paragraph_lower) for paragraph_lower in unique_paragraphs_lower]
+
+        # Topic part of the relevance for every (paragraph, target) pair, computed in one batch
+        topic_scores = self._batch_topic_scores(unique_paragraphs_lower,
+                                                [target[3] for target in precomputed_targets],
+                                                paragraphs_terms=[terms for terms, _ in paragraph_scans])
+        # Title-phrase overlap for every pair, from each distinct paragraph's token runs
+        title_overlap_scores = self._batch_title_overlap_scores(unique_paragraphs_lower,
+                                                                [target[4] for target in precomputed_targets])
+        # Cap each part (topics 0.6, title overlap 0.4) and combine them for all pairs at once
+        relevance_scores = np.minimum(np.minimum(topic_scores, 0.6) + np.minimum(title_overlap_scores, 0.4), 1.0)
+
+        for para_idx, paragraph in candidate_paragraphs:
+            previous_results = paragraph_results.get(paragraph)
+            if previous_results is not None:
+                if debug_enabled:
+                    logger.debug("Paragraph %d repeats an earlier paragraph; reusing its %d opportunities.", para_idx, len(previous_results))
+                opportunities.extend(opportunity._replace(paragraph_index=para_idx) for opportunity in previous_results)
+                processed_opportunities += len(previous_results)
                 continue
 
-            logger.debug(f"Analyzing paragraph {para_idx}...")
+            if debug_enabled:
+                logger.debug("Analyzing paragraph %d...", para_idx)
+            row = unique_rows[paragraph]
+            paragraph_lower = unique_paragraphs_lower[row]
             # Find opportunities for each target URL within this paragraph
             links_in_para = 0 # Track links per paragraph if needed for limits
-            max_links_per_para = self.config.get("max_links_per_paragraph", 2)
+            paragraph_opportunities = []
+            paragraph_results[paragraph] = paragraph_opportunities
 
-            for target in target_urls:
-                target_title = target.get("title", "")
-                target_url = target.get("url", "")
-                if not target_url or not target_title:
-                    logger.debug(f"Skipping target with missing URL or title: {target}")
-                    continue
+            # Only targets relevant enough to this paragraph, in their original order
+            relevant_cols = np.flatnonzero(relevance_scores[row] >= min_relevance_threshold)
+            if debug_enabled:
+                logger.debug("Paragraph %d: %d of %d targets below relevance %s. Skipping them.",
+                             para_idx, len(precomputed_targets) - len(relevant_cols), len(precomputed_targets), min_relevance_threshold)
 
-                # Extract topics for the target - using the loaded categories
-                # Pass empty content, only use title
-                target_topics = self._extract_topics("", target_title)
-                if not target_topics:
-                    logger.debug(f"No topics extracted for target title: '{target_title}'. Skipping relevance check.")
-                    continue
-
-                # Calculate relevance - using the loaded categories
-                relevance = self._calculate_relevance(paragraph, target_topics, target_title)
-
-                # Skip if not relevant enough
-                if relevance < min_relevance_threshold:
-                    logger.debug(f"Paragraph {para_idx} -> Target '{target_title}' relevance {relevance:.3f} < {min_relevance_threshold}. Skipping.")
-                    continue
-
-                logger.info(f"Paragraph {para_idx} -> Target '{target_title}' relevance {relevance:.3f} >= {min_relevance_threshold}. Finding anchors.")
+            for col in relevant_cols:
+                target_url, target_title, target_topics, _, _, anchor_candidates = precomputed_targets[col]
+                relevance = float(relevance_scores[row, col])
+                if debug_enabled:
+                    logger.debug("Paragraph %d -> Target '%s' relevance %.3f >= %s. Finding anchors.", para_idx, target_title, relevance, min_relevance_threshold)
 
                 # Find potential anchor text - using the loaded categories
-                anchor_options = self._find_anchor_options(paragraph, target_topics, target_title)
+                anchor_options = self._find_anchor_options(paragraph, target_topics, target_title,
+                                                           paragraph_lower=paragraph_lower,
+                                                           topic_spans=paragraph_scans[row][1],
+                                                           anchor_candidates=anchor_candidates,
+                                                           max_options=1, # Only the best anchor is used
+                                                           debug_enabled=debug_enabled)
 
                 if anchor_options:
                     # Select best anchor based on confidence/score if multiple options exist
@@ -177,57 +499,143 @@ class ContentAnalyzer:
                     best_anchor = anchor_options[0] # Assuming sorted by confidence
                     min_anchor_confidence = self.config.get("min_confidence", 0.6)
 
-                    if best_anchor.get("confidence", 0.0) >= min_anchor_confidence:
-                        logger.info(f"  Found suitable anchor: '{best_anchor['text']}' (Conf: {best_anchor['confidence']:.2f})")
-                        opportunities.append({
-                            "paragraph_index": para_idx,
-                            # "paragraph": paragraph, # Optionally exclude full paragraph for brevity
-                            "target_url": target_url,
-                            "target_title": target_title,
-                            "relevance": round(relevance, 3), # Round for cleaner output
-                            "anchor_text": best_anchor["text"],
-                            "anchor_context": best_anchor.get("context", ""), # Ensure context exists
-                            "anchor_confidence": round(best_anchor.get("confidence", 0.0), 2) # Round for output
-                        })
+                    if best_anchor.confidence >= min_anchor_confidence:
+                        if debug_enabled:
+                            logger.debug("  Found suitable anchor: '%s' (Conf: %.2f)", best_anchor.text, best_anchor.confidence)
+                        paragraph_opportunities.append(Opportunity(
+                            paragraph_index=para_idx,
+                            target_url=target_url,
+                            target_title=target_title,
+                            relevance=round(relevance, 3), # Round for cleaner output
+                            anchor_text=best_anchor.text,
+                            anchor_context=best_anchor.context,
+                            anchor_confidence=round(best_anchor.confidence, 2) # Round for output
+                        ))
                         processed_opportunities += 1
                         links_in_para += 1
                         if links_in_para >= max_links_per_para:
-                            logger.debug(f"Reached max links ({max_links_per_para}) for paragraph {para_idx}. Moving to next paragraph.")
+                            if debug_enabled:
+                                logger.debug("Reached max links (%d) for paragraph %d. Moving to next paragraph.", max_links_per_para, para_idx)
                             break # Stop checking targets for this paragraph
-                    else:
-                         logger.debug(f"  Anchor '{best_anchor['text']}' confidence {best_anchor.get('confidence', 0.0):.2f} < {min_anchor_confidence}. Skipping.")
+                    elif debug_enabled:
+                         logger.debug("  Anchor '%s' confidence %.2f < %s. Skipping.", best_anchor.text, best_anchor.confidence, min_anchor_confidence)
 
-                else:
-                    logger.debug(f"  No suitable anchor options found for target '{target_title}' in paragraph {para_idx}.")
+                elif debug_enabled:
+                    logger.debug("  No suitable anchor options found for target '%s' in paragraph %d.", target_title, para_idx)
 
-        logger.info(f"Found {processed_opportunities} raw link opportunities for title: '{title}'.")
+            opportunities.extend(paragraph_opportunities)
 
-        # Sort by relevance primarily, then confidence
-        opportunities.sort(key=lambda x: (x["relevance"], x["anchor_confidence"]), reverse=True)
+        logger.info(f"Found {processed_opportunities} raw link opportunities for title: '{title}'.")
 
-        # Apply limits (e.g., max suggestions per article)
+        # Apply limits (e.g., max suggestions per article), keeping the best by relevance primarily, then confidence
         max_suggestions = self.config.get("max_suggestions", 15) # Example limit
-        final_opportunities = opportunities[:max_suggestions]
+        top_opportunities = heapq.nlargest(max_suggestions, opportunities, key=lambda x: (x.relevance, x.anchor_confidence))
+        # Only the returned opportunities become dicts
+        final_opportunities = [opportunity._asdict() for opportunity in top_opportunities]
         logger.info(f"Returning {len(final_opportunities)} link opportunities after applying limits (max={max_suggestions}).")
 
-        duration = (datetime.now() - start_time).total_seconds()
+        self._result_cache[cache_key] = top_opportunities
+        if len(self._result_cache) > _RESULT_CACHE_SIZE:
+            self._result_cache.popitem(last=False) # Evict the least recently used entry
+
+        duration = time.perf_counter() - start_time
         logger.info(f"Content analysis completed in {duration:.3f} seconds for title: '{title}'")
         return final_opportunities # Return the limited list
 
+    def _result_cache_key(self, content: str, title: str, target_urls: List[Dict[str, str]]) -> bytes:
+        """Digest identifying an analyze_content payload in the result cache."""
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (content, title, json.dumps(target_urls, sort_keys=True, default=str)):
+            encoded = part.encode('utf-8', 'surrogatepass')
+            digest.update(len(encoded).to_bytes(8, 'little')) # Length prefix keeps part boundaries unambiguous
+            digest.update(encoded)
+        return digest.digest()
+
+    def get_result_cache_stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size of the analyze_content result cache."""
+        return {
+            "hits": self._result_cache_hits,
+            "misses": self._result_cache_misses,
+            "size": len(self._result_cache),
+        }
+
+    def _prepare_target(self, target_title: str) -> Optional[Tuple[Any, ...]]:
+        """
+        Return (target_topics, target_topics_lower, title_phrases, anchor_candidates)
+        for a target title, or None if no topics are found. The result depends only on the title and
+        the (immutable) topic tables, so it is cached across analyze_content calls.
+        """
+        if target_title in self._target_cache:
+            return self._target_cache[target_title]
+
+        # Extract topics for the target - using the loaded categories
+        # Pass empty content, only use title
+        target_topics = self._extract_topics("", target_title)
+        if target_topics:
+            target_topics_lower = frozenset(topic.lower() for topic in target_topics)
+            title_phrases = self._build_title_phrases(target_title.lower())
+            anchor_candidates = self._build_anchor_candidates(target_topics)
+            target_data = (target_topics, target_topics_lower, title_phrases, anchor_candidates)
+        else:
+            target_data = None
+
+        if len(self._target_cache) >= _TARGET_CACHE_SIZE:
+            self._target_cache.pop(next(iter(self._target_cache))) # Evict the oldest entry
+        self._target_cache[target_title] = target_data
+        return target_data
+
     def _split_into_paragraphs(self, content: str) -> List[str]:
         """Split content into paragraphs."""
         if not content: return [] # Handle empty content
-        paragraphs = re.split(r'\n\n|\n{2,}', content) # Split on 2+ newlines first
+        paragraphs = _PARAGRAPH_SPLIT_RE.split(content) # Split on 2+ newlines first
         # If minimal splitting, try single newline (less reliable)
         if len(paragraphs) <= 1 and '\n' in content:
-             paragraphs = re.split(r'\n', content)
-        return [p.strip() for p in paragraphs if p.strip()] # Ensure no empty strings
+             paragraphs = content.split('\n')
+        return [p for p in (p.strip() for p in paragraphs) if p] # Ensure no empty strings
+
+    def _build_title_phrases(self, title_lower: str) -> Dict[int, FrozenSet[str]]:
+        """Build the 2-4 word phrases of a (lowercased) title, grouped by word count."""
+        words = [w for w in title_lower.split() if len(w) > 2] # Basic word filter
+        return {
+            n: frozenset(" ".join(words[i:i+n]) for i in range(len(words) - n + 1))
+            for n in _TITLE_PHRASE_LENGTHS
+        }
+
+    def _phrase_spans(self, text_lower: str, token_counts: Set[int]) -> Set[str]:
+        """
+        Build the set of substrings of a (lowercased) text that a \b-delimited search for a title phrase
+        can match: runs of token_counts tokens, with the text between the tokens kept as is, that have
+        a word boundary at both ends. A phrase is in the set exactly when such a search finds it.
+        """
+        # (start, end, is_word) per token
+        tokens = [(match.start(), match.end(), match.group(1) is not None)
+                  for match in _PHRASE_TOKEN_RE.finditer(text_lower)]
+        spans = set()
+        for i, (start, _, is_word) in enumerate(tokens):
+            # Word tokens always start at a boundary; punctuation only right after a word character
+            if not is_word and not (i > 0 and tokens[i - 1][2] and tokens[i - 1][1] == start):
+                continue
+            for count in token_counts:
+                j = i + count - 1
+                if j >= len(tokens):
+                    continue
+                end, end_is_word = tokens[j][1], tokens[j][2]
+                if not end_is_word and not (j + 1 < len(tokens) and tokens[j + 1][2] and tokens[j + 1][0] == end):
+                    continue
+                spans.add(text_lower[start:end])
+        return spans
 
-    def _extract_topics(self, content: str, title: str) -> List[str]:
-        """Extract main topics from content and title with priority on multi-word specifics."""
+    def _extract_topics(self, content: str, title: str, search_text: Optional[str] = None,
+                        matched_terms: Optional[Set[str]] = None) -> List[str]:
+        """
+        Extract main topics from content and title with priority on multi-word specifics.
+        Callers that already hold the lowercased text can pass it as search_text, and the
+        terms found in it (from _scan_terms) as matched_terms.
+        """
         topic_scores = {}  # Track topic scores for sorting
-        # Combine content and title for searching terms
-        search_text = ((content + " " + title) if content else title).lower()
+        if search_text is None:
+            # Combine content and title for searching terms
+            search_text = ((content + " " + title) if content else title).lower()
 
         if not search_text:
             logger.debug("Cannot extract topics: search text is empty.")
@@ -238,161 +646,213 @@ class ContentAnalyzer:
             # Warning logged in caller
             return []
 
-        # Collect all matching topics with their category weights
-        for category, data in self.topic_categories.items():
-            # Use pre-lowercased terms for matching
-            terms_lower = data.get('terms_lower', set())
-            weight = data.get('weight', 1.0)
-
-            for term_lower in terms_lower:
-                # Simple substring check (consider word boundaries if needed: r'\b' + re.escape(term_lower) + r'\b')
-                if term_lower in search_text:
-                    # Use original term case for scoring if available (better for length calc)
-                    # Find the original term that matches the lowercased one
-                    original_term = term_lower # Default to lower if original not found easily
-                    for t in data.get("terms", []):
-                         if str(t).lower() == term_lower:
-                              original_term = str(t)
-                              break
-
-                    term_length_score = min(1.0, len(original_term) / 25.0)
-                    word_count = len(original_term.split())
-                    word_count_score = min(1.0, word_count / 5.0)
-
-                    score = (
-                        weight * 0.6 +
-                        word_count_score * 0.3 +
-                        term_length_score * 0.1
-                    )
-                    topic_scores[original_term] = max(score, topic_scores.get(original_term, 0))
-
-        # Sort topics by score (highest first)
-        sorted_topics = sorted(topic_scores.items(), key=lambda x: x[1], reverse=True)
+        # Collect all matching topics in one pass; scores are precomputed per term
+        # Simple substring semantics (consider word boundaries if needed)
+        term_info = self._term_info
+        if matched_terms is None:
+            matched_terms = self._match_terms(search_text)
+        for term_lower in matched_terms:
+            for original_term, score in term_info[term_lower].scores.items():
+                topic_scores[original_term] = max(score, topic_scores.get(original_term, 0))
 
-        # Take top N topics (e.g., 15)
-        topics = [term for term, score in sorted_topics[:15]]
+        # Take top N topics (e.g., 15) by score (highest first) without sorting them all
+        topics = [term for term, score in heapq.nlargest(15, topic_scores.items(), key=itemgetter(1))]
 
         logger.debug(f"Extracted topics (top {len(topics)}): {topics}")
         return topics
 
-    def _calculate_relevance(self, paragraph: str, target_topics: List[str], target_title: str) -> float:
-        """Calculate relevance between paragraph and target based on shared topics and title overlap."""
-        # Check if topics can be loaded before proceeding
-        if not self.topic_categories:
-             logger.warning("Cannot calculate relevance: topic categories not loaded.")
-             return 0.0
-
-        paragraph_lower = paragraph.lower()
-        target_title_lower = target_title.lower()
-
-        # 1. Score direct topic matches found in the paragraph
-        paragraph_topics = self._extract_topics(paragraph, "") # Extract topics from paragraph only
-        # Ensure topics are lowercased for set intersection
-        shared_topics = set(topic.lower() for topic in paragraph_topics) & set(topic.lower() for topic in target_topics)
-        logger.debug(f"Shared topics between paragraph and target '{target_title}': {shared_topics}")
-
-        topic_relevance_score = 0.0
-        for topic_lower in shared_topics:
-             score = 0.1 # Base score
-             word_count = len(topic_lower.split())
-             score += min(0.1, (word_count -1) * 0.05) # Bonus for multi-word
-
-             # Find category weight for bonus
-             for category, data in self.topic_categories.items():
-                  # Use pre-lowercased terms set for efficient check
-                  if topic_lower in data.get("terms_lower", set()):
-                       category_bonus = max(0, (data.get("weight", 1.0) - 1.0) * 0.1) # Bonus for weight > 1.0
-                       score += category_bonus
-                       logger.debug(f"  Topic '{topic_lower}' bonus from category '{category}' weight {data.get('weight', 1.0)}: +{category_bonus:.2f}")
-                       break # Assume topic belongs to only one category
-             topic_relevance_score += score
-
-        # Normalize topic relevance
-        topic_relevance_score = min(topic_relevance_score, 0.6) # Cap contribution
-
-        # 2. Score title phrase overlap (Improved)
-        title_overlap_score = 0.0
-        # Consider phrases of 2-4 words from the title
-        title_phrases = set()
-        words = [w for w in target_title_lower.split() if len(w) > 2] # Basic word filter
-        for n in range(2, 5): # Phrase lengths 2, 3, 4
-             for i in range(len(words) - n + 1):
-                  phrase = " ".join(words[i:i+n])
-                  title_phrases.add(phrase)
-
-        matched_phrase_score = 0.0
-        for phrase in title_phrases:
-             # Use regex for word boundary matching
-             if re.search(r'\b' + re.escape(phrase) + r'\b', paragraph_lower):
-                  # Score longer phrases higher
-                  phrase_score = 0.1 + min(0.15, (len(phrase.split()) - 1) * 0.05)
-                  matched_phrase_score += phrase_score
-                  logger.debug(f"  Found title phrase match: '{phrase}', adding score: {phrase_score:.2f}")
-
-        title_overlap_score = min(matched_phrase_score, 0.4) # Cap contribution
-
-        # Combine scores
-        relevance = topic_relevance_score + title_overlap_score
-        logger.debug(f"Paragraph -> Target '{target_title}': Final Relevance = {relevance:.3f} (Topic Score: {topic_relevance_score:.3f}, Title Overlap: {title_overlap_score:.3f})")
-        return min(relevance, 1.0) # Ensure score is capped at 1.0
-
-    def _find_anchor_options(self, paragraph: str, target_topics: List[str], target_title: str) -> List[Dict[str, Any]]:
+    def _topic_relevance_weight(self, topic_lower: str) -> float:
+        """Relevance contributed by one topic shared between a paragraph and a target."""
+        score = 0.1 # Base score
+        info = self._term_info.get(topic_lower)
+        word_count = info.word_count if info else len(topic_lower.split())
+        score += min(0.1, (word_count -1) * 0.05) # Bonus for multi-word
+        # Category weight bonus (first category containing the topic)
+        if info:
+            score += info.relevance_bonus
+        return score
+
+    def _batch_topic_scores(self, paragraphs_lower: List[str], targets_topics_lower: List[FrozenSet[str]],
+                            paragraphs_terms: Optional[List[Set[str]]] = None) -> np.ndarray:
+        """
+        Compute the uncapped shared-topic relevance score for every paragraph/target pair at once.
+        Each (lowercased) paragraph's topics are extracted once (from paragraphs_terms, its matched
+        terms, if given); the scores are then the product of a paragraph x topic incidence matrix
+        and a topic x target weight matrix.
+        Returns an array of shape (len(paragraphs_lower), len(targets_topics_lower)).
+        """
+        # One column per distinct topic across all targets
+        topic_columns = {}
+        for topics_lower in targets_topics_lower:
+            for topic_lower in topics_lower:
+                topic_columns.setdefault(topic_lower, len(topic_columns))
+
+        weights = np.zeros((len(topic_columns), len(targets_topics_lower)))
+        for target_col, topics_lower in enumerate(targets_topics_lower):
+            for topic_lower in topics_lower:
+                weights[topic_columns[topic_lower], target_col] = self._topic_relevance_weight(topic_lower)
+
+        incidence = np.zeros((len(paragraphs_lower), len(topic_columns)))
+        if topic_columns:
+            for row, paragraph_lower in enumerate(paragraphs_lower):
+                # Extract topics from paragraph only
+                matched_terms = paragraphs_terms[row] if paragraphs_terms is not None else None
+                for topic in self._extract_topics(paragraph_lower, "", search_text=paragraph_lower,
+                                                  matched_terms=matched_terms):
+                    topic_col = topic_columns.get(topic.lower())
+                    if topic_col is not None:
+                        incidence[row, topic_col] = 1.0
+        return incidence @ weights
+
+    def _batch_title_overlap_scores(self, paragraphs_lower: List[str],
+                                    targets_title_phrases: List[Dict[int, FrozenSet[str]]]) -> np.ndarray:
+        """
+        Compute the uncapped title-phrase overlap score for every paragraph/target pair at once.
+        A title phrase is found in a (lowercased) paragraph when a \b-delimited search would find it,
+        i.e. when it is one of the paragraph's phrase spans. For each phrase length the number of a
+        target's title phrases found in a paragraph is the product of a paragraph x phrase incidence
+        matrix and a phrase x target matrix; each match adds a per-length score, higher for longer phrases.
+        Returns an array of shape (len(paragraphs_lower), len(targets_title_phrases)).
+        """
+        scores = np.zeros((len(paragraphs_lower), len(targets_title_phrases)))
+        # Token counts of all the title phrases, so each paragraph's spans are built once for all targets
+        token_counts = {len(_PHRASE_TOKEN_RE.findall(phrase))
+                        for title_phrases in targets_title_phrases
+                        for phrases in title_phrases.values() for phrase in phrases}
+        if not token_counts:
+            return scores
+        paragraphs_spans = [self._phrase_spans(paragraph_lower, token_counts) for paragraph_lower in paragraphs_lower]
+        for n in _TITLE_PHRASE_LENGTHS:
+            # One column per distinct n-word phrase across all target titles
+            phrase_columns = {}
+            for title_phrases in targets_title_phrases:
+                for phrase in title_phrases[n]:
+                    phrase_columns.setdefault(phrase, len(phrase_columns))
+            if not phrase_columns:
+                continue
+
+            membership = np.zeros((len(phrase_columns), len(targets_title_phrases)))
+            for target_col, title_phrases in enumerate(targets_title_phrases):
+                for phrase in title_phrases[n]:
+                    membership[phrase_columns[phrase], target_col] = 1.0
+
+            incidence = np.zeros((len(paragraphs_lower), len(phrase_columns)))
+            for row, paragraph_spans in enumerate(paragraphs_spans):
+                for phrase, phrase_col in phrase_columns.items():
+                    if phrase in paragraph_spans:
+                        incidence[row, phrase_col] = 1.0
+
+            # Score longer phrases higher
+            phrase_score = 0.1 + min(0.15, (n - 1) * 0.05)
+            scores += (incidence @ membership) * phrase_score
+        return scores
+
+    def _build_anchor_candidates(self, target_topics: List[str]) -> List[Tuple[str, str, float]]:
+        """
+        Precompute (topic, lowercased topic, confidence) for a target's topics, highest confidence
+        first (longest first among equal confidence). None of this depends on the paragraph,
+        so callers can build it once per target.
+        """
+        anchor_candidates = []
+        # Prioritize longer, more specific target topics found in the paragraph
+        # Sort target topics by length descending
+        for topic in sorted(target_topics, key=len, reverse=True):
+            topic_lower = topic.lower()
+            info = self._term_info.get(topic_lower)
+            word_count = info.word_count if info else len(topic_lower.split())
+            # Calculate confidence (higher for longer topics, plus category weight bonus)
+            confidence = 0.5 + min(0.4, word_count * 0.08) # Adjusted scoring
+            if info:
+                confidence += info.confidence_bonus
+            confidence = min(confidence, 1.0) # Cap confidence
+            anchor_candidates.append((topic, topic_lower, round(confidence, 2)))
+        # Stable sort keeps the length order within each confidence level; lets
+        # _find_anchor_options stop once no remaining candidate can make the top options
+        anchor_candidates.sort(key=itemgetter(2), reverse=True)
+        return anchor_candidates
+
+    def _find_anchor_options(self, paragraph: str, target_topics: List[str], target_title: str,
+                             paragraph_lower: Optional[str] = None,
+                             topic_spans: Optional[Dict[str, Tuple[int, int]]] = None,
+                             anchor_candidates: Optional[List[Tuple[str, str, float]]] = None,
+                             max_options: int = 5,
+                             debug_enabled: Optional[bool] = None) -> List[AnchorOption]:
         """
         Find potential anchor text options in the paragraph.
         Focuses on matching target topics found within the paragraph text.
+        topic_spans, if given, maps each lowercased target topic found in the paragraph to the
+        span of its first whole-word occurrence (see _scan_terms); anchor_candidates is
+        the target's _build_anchor_candidates result. Returns the best max_options options.
+        debug_enabled lets a calling loop pass its DEBUG level check instead of repeating it.
         """
-        logger.debug(f"Finding anchor options for target '{target_title}' in paragraph snippet: '{paragraph[:100]}...'")
+        if paragraph_lower is None:
+            paragraph_lower = paragraph.lower()
+        if anchor_candidates is None:
+            anchor_candidates = self._build_anchor_candidates(target_topics)
+        if debug_enabled is None:
+            debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            logger.debug("Finding anchor options for target '%s' in paragraph snippet: '%s...'", target_title, paragraph[:100])
         anchor_options = []
         seen_texts_lower = set() # Avoid duplicates based on lowercase text
 
-        # Prioritize longer, more specific target topics found in the paragraph
-        # Sort target topics by length descending
-        sorted_target_topics = sorted(target_topics, key=len, reverse=True)
-
-        for topic in sorted_target_topics:
-            topic_lower = topic.lower()
-            # Use regex to find topic with word boundaries in the paragraph
-            # Need to escape potential regex characters in the topic itself
-            try:
-                # Find all occurrences to potentially choose the best context later
-                matches = list(re.finditer(r'\b' + re.escape(topic_lower) + r'\b', paragraph.lower()))
-            except re.error:
-                 logger.warning(f"Regex error finding anchor for topic: '{topic}'. Skipping.")
-                 continue # Skip this topic if regex fails
-
-            if matches:
-                # Use the original casing from the topic list as the primary anchor text
-                original_case_topic = topic
-                if original_case_topic.lower() not in seen_texts_lower:
-                    # Calculate confidence (higher for longer topics, maybe add category weight bonus?)
-                    confidence = 0.5 + min(0.4, len(original_case_topic.split()) * 0.08) # Adjusted scoring
-
-                    # Find category weight bonus
-                    for category, data in self.topic_categories.items():
-                        if topic_lower in data.get("terms_lower", set()):
-                             confidence += max(0, (data.get("weight", 1.0) - 1.0) * 0.05) # Small weight bonus
-                             break
-
-                    confidence = min(confidence, 1.0) # Cap confidence
-
-                    # Extract context around the first match found
-                    first_match_span = matches[0].span()
-                    context = self._extract_context_span(paragraph, first_match_span, original_case_topic)
-
-                    anchor_options.append({
-                        "text": original_case_topic,
-                        "confidence": round(confidence, 2),
-                        "context": context,
-                        "position": first_match_span[0] # Store position of first match
-                    })
-                    seen_texts_lower.add(original_case_topic.lower())
-                    logger.debug(f"  Found anchor option: '{original_case_topic}' (Confidence: {confidence:.2f})")
-
-        # Sort options by confidence primarily, then position (earlier preferred)
-        anchor_options.sort(key=lambda x: (x["confidence"], -x["position"]), reverse=True)
-
-        logger.debug(f"Found {len(anchor_options)} anchor options for target '{target_title}'.")
-        return anchor_options[:5] # Return top 5 options
+        for original_case_topic, topic_lower, confidence in anchor_candidates:
+            # Candidates come in descending confidence, so once max_options are found only ties
+            # (which may still win on position) can change the result
+            if len(anchor_options) >= max_options and confidence < anchor_options[max_options - 1].confidence:
+                break
+            if topic_lower in seen_texts_lower:
+                continue
+            # Find the first occurrence of the topic with word boundaries in the paragraph
+            if topic_spans is not None:
+                first_match_span = topic_spans.get(topic_lower)
+            else:
+                first_match_span = self._find_whole_word(paragraph_lower, topic_lower)
+
+            if first_match_span is not None:
+                # Extract context around the first match found
+                # (uses the original casing from the topic list as the anchor text)
+                context = self._extract_context_span(paragraph, first_match_span, original_case_topic)
+
+                anchor_options.append(AnchorOption(
+                    text=original_case_topic,
+                    confidence=confidence,
+                    context=context,
+                    position=first_match_span[0] # Store position of first match
+                ))
+                seen_texts_lower.add(topic_lower)
+                if debug_enabled:
+                    logger.debug("  Found anchor option: '%s' (Confidence: %.2f)", original_case_topic, confidence)
+
+        if debug_enabled:
+            logger.debug("Found %d anchor options for target '%s'.", len(anchor_options), target_title)
+        # Return top options by confidence primarily, then position (earlier preferred)
+        return heapq.nlargest(max_options, anchor_options, key=lambda x: (x.confidence, -x.position))
+
+    def _find_whole_word(self, text_lower: str, term_lower: str) -> Optional[Tuple[int, int]]:
+        """
+        Return the span of the first occurrence of term_lower in text_lower bounded by word
+        boundaries (same semantics as re.search(r'\\b' + re.escape(term) + r'\\b')), or None.
+        Uses str.find plus neighbour checks instead of compiling a regex per topic.
+        """
+        if not term_lower:
+            return None
+        term_len = len(term_lower)
+        pos = text_lower.find(term_lower)
+        while pos != -1:
+            if self._has_word_boundaries(text_lower, pos, pos + term_len):
+                return pos, pos + term_len
+            pos = text_lower.find(term_lower, pos + 1)
+        return None
+
+    def _has_word_boundaries(self, text: str, start: int, end: int) -> bool:
+        """Check that text[start:end] (non-empty) has regex \\b word boundaries at both ends."""
+        # A boundary exists where word-ness changes between neighbouring characters
+        inner_start = text[start].isalnum() or text[start] == '_'
+        inner_end = text[end - 1].isalnum() or text[end - 1] == '_'
+        before = start > 0 and (text[start - 1].isalnum() or text[start - 1] == '_')
+        after = end < len(text) and (text[end].isalnum() or text[end] == '_')
+        return before != inner_start and after != inner_end
 
     def _extract_context_span(self, paragraph: str, span: Tuple[int, int], anchor_text: str) -> str:
          """Extract context around a given character span, highlighting the anchor."""
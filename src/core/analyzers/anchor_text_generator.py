@@ -10,17 +10,135 @@ This module generates high-quality anchor text that:
 """
 
 import re
+import heapq
 import logging
 import string
-from typing import List, Dict, Any, Tuple, Set, Optional
+from bisect import bisect_left
+from functools import lru_cache
+from typing import List, Dict, Any, NamedTuple, Sequence, Tuple, Set, Optional
+import numpy as np
 import nltk
 from nltk.tokenize import word_tokenize, sent_tokenize
-from nltk.tag import pos_tag
+from nltk.tag.perceptron import PerceptronTagger
 import random
 
+try:
+    import ahocorasick # pyahocorasick: single-pass multi-phrase search
+except ImportError:
+    ahocorasick = None
+
 # Configure logging
 logger = logging.getLogger("web_analyzer.anchor_text_generator")
 
+# Sentence boundary used when extracting the sentence around a keyword occurrence
+_PERIOD_RE = re.compile(r"\.")
+
+class AnchorCandidate(NamedTuple):
+    """A candidate anchor phrase emitted by one of the extractors (score is set by scoring)."""
+    phrase: str
+    phrase_lower: str
+    type: str # "natural", "intent" or "keyword"
+    position: int # Start of the phrase in the source text
+    score: float = 0.0
+
+# Starting score of an anchor candidate by the extractor that produced it
+_BASE_SCORES = {
+    "natural": 0.6,
+    "intent": 0.8,
+    "keyword": 0.5
+}
+
+# NLTK tokenizing/tagging dominates this module's cost and the same paragraph, sentences and
+# target titles come back for every target, so results are memoized. They are cached as tuples
+# (hashable, and safe to share since callers can't mutate them). Tokens and tags are cached per
+# sentence, with room for many, since boilerplate sentences also recur across documents. Whole
+# texts are only split into sentences again for the next targets of the same paragraph, so only
+# a few are kept
+_SENTENCE_CACHE_SIZE = 8192
+_TEXT_CACHE_SIZE = 32
+
+@lru_cache(maxsize=_TEXT_CACHE_SIZE)
+def _cached_sent_tokenize(text: str) -> Tuple[str, ...]:
+    return tuple(sent_tokenize(text))
+
+@lru_cache(maxsize=_SENTENCE_CACHE_SIZE)
+def _cached_word_tokenize(text: str) -> Tuple[str, ...]:
+    return tuple(word_tokenize(text))
+
+# Punkt only ends sentences at these characters
+_SENTENCE_END_CHARS = frozenset(".?!")
+
+@lru_cache(maxsize=1024)
+def _cached_phrase_tokenize(text: str) -> Tuple[str, ...]:
+    # Titles and keywords are usually single phrases: with nowhere for Punkt to end a sentence,
+    # skip word_tokenize's sentence split and run only the Treebank word tokenizer, which gives
+    # the same tokens. Otherwise split sentences as before, so the period in "Tips. A Guide" is
+    # still a token of its own
+    if _SENTENCE_END_CHARS.isdisjoint(text):
+        return tuple(word_tokenize(text, preserve_line=True))
+    return tuple(word_tokenize(text))
+
+@lru_cache(maxsize=_SENTENCE_CACHE_SIZE)
+def _cached_pos_tag(tokens: Tuple[str, ...]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(_get_pos_tagger().tag(list(tokens)))
+
+_pos_tagger: Optional[PerceptronTagger] = None
+
+def _get_pos_tagger() -> PerceptronTagger:
+    """
+    The English tagger used by nltk's pos_tag, loaded on first use and then kept.
+    pos_tag itself builds a new PerceptronTagger, searching nltk.data.path for the model, on every call.
+    """
+    global _pos_tagger
+    if _pos_tagger is None:
+        _pos_tagger = PerceptronTagger()
+        logger.info("Loaded NLTK averaged perceptron tagger.")
+    return _pos_tagger
+
+@lru_cache(maxsize=256)
+def _phrase_automaton(phrases: Tuple[str, ...]):
+    """Aho-Corasick automaton over the given phrases, cached since each target's phrases recur per paragraph."""
+    automaton = ahocorasick.Automaton()
+    for phrase in phrases:
+        automaton.add_word(phrase, phrase)
+    automaton.make_automaton()
+    return automaton
+
+def _find_first_positions(text: str, phrases: Tuple[str, ...]) -> Dict[str, int]:
+    """Start of the first occurrence (as text.find gives it) of each phrase that occurs in text."""
+    if not phrases:
+        return {}
+    if ahocorasick is None:
+        positions = {}
+        for phrase in phrases:
+            if phrase not in positions:
+                position = text.find(phrase)
+                if position != -1:
+                    positions[phrase] = position
+        return positions
+    # Hits come in order of their end index, so a phrase's first hit is its leftmost occurrence
+    positions = {}
+    for end_index, phrase in _phrase_automaton(phrases).iter(text):
+        if phrase not in positions:
+            positions[phrase] = end_index - len(phrase) + 1
+    return positions
+
+def _find_all_positions(text: str, phrases: Tuple[str, ...]) -> Dict[str, List[int]]:
+    """Starts of all (possibly overlapping) occurrences of each phrase that occurs in text, in order."""
+    positions: Dict[str, List[int]] = {}
+    if not phrases:
+        return positions
+    if ahocorasick is None:
+        for phrase in phrases:
+            position = text.find(phrase)
+            while position != -1:
+                positions.setdefault(phrase, []).append(position)
+                position = text.find(phrase, position + 1)
+        return positions
+    for end_index, phrase in _phrase_automaton(phrases).iter(text):
+        positions.setdefault(phrase, []).append(end_index - len(phrase) + 1)
+    return positions
+
 class AnchorTextGenerator:
     """
     Advanced anchor text generator that creates high-quality, 
@@ -36,25 +154,34 @@ class AnchorTextGenerator:
         self.max_words = 6  # Maximum words
         
         # Phrases to avoid using as complete anchor text
-        self.weak_phrases = {
+        self.weak_phrases = frozenset({
             "click here", "read more", "learn more", "find out more", "discover",
             "check out", "see here", "view this", "this page", "full article",
             "details here", "more info", "click", "here", "link", "url", "website"
-        }
+        })
         
         # Words to avoid starting anchor text with
-        self.weak_starters = {
+        self.weak_starters = frozenset({
             "the", "a", "an", "and", "or", "but", "because", "since", "when", "by",
             "for", "with", "about", "against", "before", "after", "above", "below",
             "to", "of", "in", "on", "at", "from", "into", "during", "until", "while"
-        }
+        })
         
         # Words to avoid ending anchor text with
-        self.weak_endings = {
+        self.weak_endings = frozenset({
             "the", "a", "an", "and", "or", "but", "if", "with", "of", "to", "for",
             "in", "on", "at", "by", "about", "as", "into", "like", "through", "after", 
             "over", "between", "out", "against", "during", "without", "before", "under"
-        }
+        })
+        
+        # The same words as prefixes/suffixes for the str.startswith/endswith structure check
+        self._weak_starter_prefixes = tuple(self.weak_starters)
+        self._weak_ending_suffixes = tuple(self.weak_endings)
+        
+        # Search intent indicators (plain substrings of the phrase)
+        self._intent_re = re.compile("|".join(map(re.escape, [
+            "how to", "guide", "tips", "tutorial", "for men", "for women"
+        ])))
         
         # Part-of-speech patterns that make good anchor text
         # Each pattern is a sequence of POS tags that forms a valid phrase
@@ -84,6 +211,19 @@ class AnchorTextGenerator:
             ["WRB", "TO", "VB", "NNS"],  # e.g., "how to wear shirts"
             ["WRB", "TO", "VB", "JJ", "NNS"],  # e.g., "how to wear blue shirts"
         ]
+        # Patterns as rows of mask columns (one per distinct pattern tag) for _match_pos_patterns;
+        # shorter patterns are padded with an extra always-true column
+        self._pattern_tags = sorted({pos for pattern in self.good_pos_patterns for pos in pattern})
+        tag_columns = {pos: col for col, pos in enumerate(self._pattern_tags)}
+        max_pattern_len = max(len(pattern) for pattern in self.good_pos_patterns)
+        self._pattern_columns = np.array([
+            [tag_columns[pos] for pos in pattern] + [len(self._pattern_tags)] * (max_pattern_len - len(pattern))
+            for pattern in self.good_pos_patterns
+        ])
+        # Columns of the tags patterns can start with; other start positions are skipped
+        self._head_columns = sorted({tag_columns[pattern[0]] for pattern in self.good_pos_patterns})
+        self._heads_by_tag: Dict[str, bool] = {} # POS tag -> can it start a pattern
+        self._tag_masks: Dict[str, Tuple[bool, ...]] = {} # POS tag -> _tag_mask result
     
     def generate_anchor_options(
         self, 
@@ -108,30 +248,37 @@ class AnchorTextGenerator:
         
         anchor_options = []
         
+        # Lowercase the text and keywords once; shared by the extractors and scoring
+        text_lower = text.lower()
+        keywords_lower = [keyword.lower() for keyword in target_keywords]
+        
         # 1. Extract natural phrases from text
-        natural_phrases = self._extract_natural_phrases(text, target_keywords)
+        natural_phrases = self._extract_natural_phrases(text, target_keywords, text_lower=text_lower,
+                                                        keywords_lower=keywords_lower)
         
         # 2. Generate search intent phrases
-        intent_phrases = self._generate_intent_phrases(text, target_keywords, target_title)
+        intent_phrases = self._generate_intent_phrases(text, target_keywords, target_title, text_lower=text_lower)
         
         # 3. Extract keyword-matched phrases
-        keyword_phrases = self._extract_keyword_phrases(text, target_keywords)
+        keyword_phrases = self._extract_keyword_phrases(text, target_keywords, text_lower=text_lower)
         
-        # 4. Score all candidate phrases
-        all_phrases = natural_phrases + intent_phrases + keyword_phrases
-        scored_phrases = self._score_anchor_candidates(all_phrases, target_keywords, target_title)
+        # 4. Deduplicate, then score only the remaining candidate phrases
+        all_phrases = self._dedupe_candidates(natural_phrases + intent_phrases + keyword_phrases)
+        scored_phrases = self._score_anchor_candidates(all_phrases, target_keywords, target_title,
+                                                       keywords_lower=keywords_lower)
         
-        # 5. Filter and sort candidates
+        # 5. Sort candidates and keep the best
         filtered_options = self._filter_anchor_candidates(scored_phrases)
         
         # Format results
         for option in filtered_options:
-            anchor_text = option["phrase"]
-            score = option["score"]
-            position = option.get("position", 0)
+            anchor_text = option.phrase
+            score = option.score
+            position = option.position
             
             # Extract context
-            context = self._extract_context(text, anchor_text, position)
+            context = self._extract_context(text, anchor_text, position,
+                                            text_lower=text_lower, anchor_lower=option.phrase_lower)
             
             anchor_options.append({
                 "text": anchor_text,
@@ -142,64 +289,117 @@ class AnchorTextGenerator:
         
         return anchor_options
     
-    def _extract_natural_phrases(self, text: str, target_keywords: List[str]) -> List[Dict[str, Any]]:
+    def _extract_natural_phrases(self, text: str, target_keywords: List[str], text_lower: Optional[str] = None,
+                                 keywords_lower: Optional[List[str]] = None) -> List[AnchorCandidate]:
         """
         Extract natural language phrases from text.
         
         This uses POS tagging to identify phrases with structure that makes good anchor text.
+        The lowercased text and keywords can be passed in if the caller already has them.
         """
         natural_phrases = []
+        if text_lower is None:
+            text_lower = text.lower()
+        if keywords_lower is None:
+            keywords_lower = [keyword.lower() for keyword in target_keywords]
+        # Tests a phrase for all the keywords (as plain substrings) in one pass; the automaton is
+        # cached per keyword set, so a target's keywords recurring across paragraphs reuse it.
+        # The automaton never matches an empty keyword, which as a substring matches every phrase,
+        # so blank keywords are left out of it and still tested with `in`
+        keyword_automaton = None
+        blank_keywords_lower = [keyword_lower for keyword_lower in keywords_lower if not keyword_lower.strip()]
+        automaton_keywords = tuple(keyword_lower for keyword_lower in keywords_lower if keyword_lower.strip())
+        if ahocorasick is not None and automaton_keywords:
+            keyword_automaton = _phrase_automaton(automaton_keywords)
+        
+        pattern_lengths = [len(pattern) for pattern in self.good_pos_patterns]
         
         try:
             # Tokenize text
-            sentences = sent_tokenize(text)
+            sentences = _cached_sent_tokenize(text)
             
             # Process each sentence
             for sent_idx, sentence in enumerate(sentences):
                 # Tokenize and tag
-                tokens = word_tokenize(sentence)
-                tagged = pos_tag(tokens)
+                tokens = _cached_word_tokenize(sentence)
+                tagged = _cached_pos_tag(tokens)
                 
                 # Find phrases matching our good patterns
-                for i in range(len(tagged)):
-                    for pattern in self.good_pos_patterns:
-                        # Check if there's enough tokens left
-                        if i + len(pattern) > len(tagged):
-                            continue
-                        
-                        # Check if pattern matches
-                        matches_pattern = True
-                        for j, pos in enumerate(pattern):
-                            # Allow some flexibility in POS matching
-                            if not tagged[i+j][1].startswith(pos):
-                                matches_pattern = False
-                                break
-                        
-                        if matches_pattern:
-                            # Extract phrase
-                            phrase_tokens = [tagged[i+j][0] for j in range(len(pattern))]
-                            phrase = " ".join(phrase_tokens)
-                            
-                            # Calculate position in original text
-                            position = text.lower().find(phrase.lower())
-                            
-                            # Only include phrases that contain at least one target keyword
-                            if any(keyword.lower() in phrase.lower() for keyword in target_keywords):
-                                natural_phrases.append({
-                                    "phrase": phrase,
-                                    "type": "natural",
-                                    "position": position if position != -1 else 0
-                                })
+                for i, pattern_idx in self._match_pos_patterns([tag for _, tag in tagged]):
+                    # Extract phrase (the tagger keeps the tokens as given, so slice them directly)
+                    phrase = " ".join(tokens[i:i + pattern_lengths[pattern_idx]])
+                    phrase_lower = phrase.lower()
+                    
+                    # Only include phrases that contain at least one target keyword
+                    if keyword_automaton is not None:
+                        has_keyword = (next(keyword_automaton.iter(phrase_lower), None) is not None
+                                       or any(keyword_lower in phrase_lower for keyword_lower in blank_keywords_lower))
+                    else:
+                        has_keyword = any(keyword_lower in phrase_lower for keyword_lower in keywords_lower)
+                    if has_keyword:
+                        # Calculate position in original text
+                        position = text_lower.find(phrase_lower)
+                        natural_phrases.append(AnchorCandidate(
+                            phrase=phrase,
+                            phrase_lower=phrase_lower,
+                            type="natural",
+                            position=position if position != -1 else 0
+                        ))
         except Exception as e:
             logger.warning(f"Error extracting natural phrases: {str(e)}")
         
         return natural_phrases
     
-    def _generate_intent_phrases(self, text: str, target_keywords: List[str], target_title: str) -> List[Dict[str, Any]]:
+    def _match_pos_patterns(self, tags: Sequence[str]) -> List[Tuple[int, int]]:
+        """
+        Find where the good POS patterns match a sentence's tag sequence.
+        
+        A pattern tag matches any tag it prefixes (allowing some flexibility, e.g. "NN" also
+        matches "NNS"). The sentence becomes a token x pattern-tag boolean matrix, and every
+        pattern is checked at every start position whose tag can begin a pattern with one
+        fancy-indexing lookup.
+        
+        Returns:
+            (start index, pattern index) pairs, ordered by start and then pattern
+        """
+        n = len(tags)
+        if not n:
+            return []
+        max_len = self._pattern_columns.shape[1]
+        # Rows past the end of the sentence only match the padding column
+        masks = np.zeros((n + max_len - 1, len(self._pattern_tags) + 1), dtype=bool)
+        masks[:, -1] = True
+        masks[:n] = [self._tag_mask(tag) for tag in tags]
+        
+        heads_by_tag = self._heads_by_tag
+        starts = [i for i, tag in enumerate(tags) if heads_by_tag[tag]]
+        if not starts:
+            return []
+        
+        offsets = np.array(starts)[:, None] + np.arange(max_len) # Token index of each pattern element
+        hits = masks[offsets[:, None, :], self._pattern_columns].all(axis=2) # (start, pattern)
+        return [(starts[row], int(pattern_idx)) for row, pattern_idx in np.argwhere(hits)]
+    
+    def _tag_mask(self, tag: str) -> Tuple[bool, ...]:
+        """
+        Which pattern tags prefix a POS tag (plus the always-true padding column), memoized per tag
+        together with whether the tag can start a pattern.
+        """
+        mask = self._tag_masks.get(tag)
+        if mask is None:
+            mask = tuple(tag.startswith(pos) for pos in self._pattern_tags) + (True,)
+            self._tag_masks[tag] = mask
+            self._heads_by_tag[tag] = any(mask[col] for col in self._head_columns)
+        return mask
+    
+    def _generate_intent_phrases(self, text: str, target_keywords: List[str], target_title: str,
+                                 text_lower: Optional[str] = None) -> List[AnchorCandidate]:
         """
         Generate search intent phrases that combine target keywords with intent modifiers.
         """
         intent_phrases = []
+        if text_lower is None:
+            text_lower = text.lower()
         
         # Intent modifiers
         prefixes = ["how to", "guide to", "tips for", "best way to"]
@@ -209,8 +409,8 @@ class AnchorTextGenerator:
         title_keywords = []
         if target_title:
             try:
-                title_tokens = word_tokenize(target_title)
-                title_tagged = pos_tag(title_tokens)
+                title_tokens = _cached_phrase_tokenize(target_title)
+                title_tagged = _cached_pos_tag(title_tokens)
                 
                 # Extract nouns from title
                 title_keywords = [word for word, tag in title_tagged 
@@ -221,72 +421,71 @@ class AnchorTextGenerator:
         # Combine all keywords
         all_keywords = target_keywords + title_keywords
         
-        # Generate intent phrases by combining keywords with modifiers
+        # Generate intent phrases by combining keywords with modifiers:
+        # prefix + keyword phrases, then keyword + suffix phrases, for each keyword
+        candidate_phrases = []
         for keyword in all_keywords:
-            # Create prefix + keyword phrases
-            for prefix in prefixes:
-                phrase = f"{prefix} {keyword}"
-                # Check if it exists in the text
-                position = text.lower().find(phrase.lower())
-                if position != -1:
-                    intent_phrases.append({
-                        "phrase": phrase,
-                        "type": "intent",
-                        "position": position
-                    })
-            
-            # Create keyword + suffix phrases
-            for suffix in suffixes:
-                phrase = f"{keyword} {suffix}"
-                # Check if it exists in the text
-                position = text.lower().find(phrase.lower())
-                if position != -1:
-                    intent_phrases.append({
-                        "phrase": phrase,
-                        "type": "intent",
-                        "position": position
-                    })
+            candidate_phrases.extend(f"{prefix} {keyword}" for prefix in prefixes)
+            candidate_phrases.extend(f"{keyword} {suffix}" for suffix in suffixes)
+        candidate_phrases_lower = tuple(phrase.lower() for phrase in candidate_phrases)
+        
+        # Check which ones exist in the text, all in one pass over it
+        first_positions = _find_first_positions(text_lower, candidate_phrases_lower)
+        for phrase, phrase_lower in zip(candidate_phrases, candidate_phrases_lower):
+            position = first_positions.get(phrase_lower, -1)
+            if position != -1:
+                intent_phrases.append(AnchorCandidate(
+                    phrase=phrase,
+                    phrase_lower=phrase_lower,
+                    type="intent",
+                    position=position
+                ))
         
         return intent_phrases
     
-    def _extract_keyword_phrases(self, text: str, target_keywords: List[str]) -> List[Dict[str, Any]]:
+    def _extract_keyword_phrases(self, text: str, target_keywords: List[str],
+                                 text_lower: Optional[str] = None) -> List[AnchorCandidate]:
         """
         Extract phrases containing target keywords with surrounding context.
         """
         keyword_phrases = []
+        if text_lower is None:
+            text_lower = text.lower()
+        
+        # Skip very short keywords
+        keywords = [keyword for keyword in target_keywords if len(keyword) >= 4]
+        
+        # Every occurrence of every keyword, found in one pass over the text
+        keyword_occurrences = _find_all_positions(text_lower, tuple({keyword.lower() for keyword in keywords}))
+        # Sentence boundaries, located once for all occurrences
+        periods = [match.start() for match in _PERIOD_RE.finditer(text_lower)] if keyword_occurrences else []
         
         # Extract up to 3 words around each keyword
-        for keyword in target_keywords:
-            # Skip very short keywords
-            if len(keyword) < 4:
-                continue
-                
-            # Find all occurrences of the keyword
-            keyword_lower = keyword.lower()
-            text_lower = text.lower()
-            
-            start_pos = 0
-            while start_pos < len(text_lower):
-                pos = text_lower.find(keyword_lower, start_pos)
-                if pos == -1:
-                    break
+        for keyword in keywords:
+            # Tokens of the keyword, to find it in each sentence's tokens
+            keyword_tokens = _cached_phrase_tokenize(keyword)
+            keyword_tokens_lower = [t.lower() for t in keyword_tokens]
+
+            # Walk the occurrences of the keyword, each search resuming after the previous match
+            next_start = 0
+            for pos in keyword_occurrences.get(keyword.lower(), ()):
+                if pos < next_start:
+                    continue
                 
-                # Extract sentence containing the keyword
-                sent_start = max(0, text_lower.rfind(".", 0, pos) + 1)
-                sent_end = text_lower.find(".", pos)
-                if sent_end == -1:
-                    sent_end = len(text_lower)
+                # Extract sentence containing the keyword (between the periods around it)
+                period_idx = bisect_left(periods, pos)
+                sent_start = periods[period_idx - 1] + 1 if period_idx > 0 else 0
+                sent_end = periods[period_idx] if period_idx < len(periods) else len(text_lower)
                 
                 sentence = text[sent_start:sent_end].strip()
                 
                 # Tokenize sentence
-                tokens = word_tokenize(sentence)
+                tokens = _cached_word_tokenize(sentence)
+                tokens_lower = [t.lower() for t in tokens]
                 
                 # Find keyword in tokens
-                keyword_tokens = word_tokenize(keyword)
-                
                 for i in range(len(tokens) - len(keyword_tokens) + 1):
-                    if [t.lower() for t in tokens[i:i+len(keyword_tokens)]] == [t.lower() for t in keyword_tokens]:
+                    if tokens_lower[i:i+len(keyword_tokens)] == keyword_tokens_lower:
                         # Extract up to 3 words before and after
                         start_idx = max(0, i - 3)
                         end_idx = min(len(tokens), i + len(keyword_tokens) + 3)
@@ -298,24 +497,27 @@ class AnchorTextGenerator:
                         phrase = phrase.strip(string.punctuation + " ")
                         
                         # Check if the phrase meets length requirements
-                        if len(phrase.split()) >= self.min_words and len(phrase.split()) <= self.max_words:
-                            keyword_phrases.append({
-                                "phrase": phrase,
-                                "type": "keyword",
-                                "position": pos
-                            })
+                        word_count = len(phrase.split())
+                        if word_count >= self.min_words and word_count <= self.max_words:
+                            keyword_phrases.append(AnchorCandidate(
+                                phrase=phrase,
+                                phrase_lower=phrase.lower(),
+                                type="keyword",
+                                position=pos
+                            ))
                 
                 # Move to next occurrence
-                start_pos = pos + len(keyword)
+                next_start = pos + len(keyword)
         
         return keyword_phrases
     
     def _score_anchor_candidates(
         self, 
-        candidates: List[Dict[str, Any]], 
+        candidates: List[AnchorCandidate], 
         target_keywords: List[str],
-        target_title: str
-    ) -> List[Dict[str, Any]]:
+        target_title: str,
+        keywords_lower: Optional[List[str]] = None
+    ) -> List[AnchorCandidate]:
         """
         Score anchor text candidates based on quality and relevance.
         """
@@ -325,36 +527,41 @@ class AnchorTextGenerator:
         if not candidates:
             return []
         
+        if keywords_lower is None:
+            keywords_lower = [keyword.lower() for keyword in target_keywords]
+        
         # Get title keywords
-        title_words = word_tokenize(target_title.lower()) if target_title else []
+        title_words = _cached_phrase_tokenize(target_title.lower()) if target_title else ()
+        
+        # Per-call constants, looked up once instead of per candidate
+        min_words, max_words = self.min_words, self.max_words
+        intent_re = self._intent_re
+        weak_phrases, weak_starters, weak_endings = self.weak_phrases, self.weak_starters, self.weak_endings
+        weak_starter_prefixes, weak_ending_suffixes = self._weak_starter_prefixes, self._weak_ending_suffixes
         
         for candidate in candidates:
-            phrase = candidate["phrase"]
-            phrase_lower = phrase.lower()
+            phrase = candidate.phrase
+            phrase_lower = candidate.phrase_lower
             phrase_words = phrase_lower.split()
             
             # Start with base score based on type
-            base_score = {
-                "natural": 0.6,
-                "intent": 0.8,
-                "keyword": 0.5
-            }.get(candidate["type"], 0.5)
+            base_score = _BASE_SCORES.get(candidate.type, 0.5)
             
             score = base_score
             
             # Adjust score based on various factors
             
             # 1. Keyword presence and density
-            keyword_matches = sum(1 for keyword in target_keywords 
-                                if keyword.lower() in phrase_lower)
+            keyword_matches = sum(1 for keyword_lower in keywords_lower
+                                if keyword_lower in phrase_lower)
             keyword_score = min(0.3, 0.1 * keyword_matches)
             score += keyword_score
             
             # 2. Phrase length
             word_count = len(phrase_words)
-            if word_count < self.min_words:
+            if word_count < min_words:
                 score -= 0.2
-            elif word_count > self.max_words:
+            elif word_count > max_words:
                 score -= 0.1
             elif word_count == 2:
                 score += 0.05
@@ -367,23 +574,22 @@ class AnchorTextGenerator:
             score += title_score
             
             # 4. Search intent indicators
-            intent_phrases = ["how to", "guide", "tips", "tutorial", "for men", "for women"]
-            if any(intent in phrase_lower for intent in intent_phrases):
+            if intent_re.search(phrase_lower):
                 score += 0.15
             
             # 5. Weak phrase penalty
-            if phrase_lower in self.weak_phrases:
+            if phrase_lower in weak_phrases:
                 score -= 0.5
             
             # 6. Weak start/end penalty
-            if phrase_words and phrase_words[0] in self.weak_starters:
+            if phrase_words and phrase_words[0] in weak_starters:
                 score -= 0.1
-            if phrase_words and phrase_words[-1] in self.weak_endings:
+            if phrase_words and phrase_words[-1] in weak_endings:
                 score -= 0.1
             
             # 7. Grammar/structure penalty for incomplete phrases
-            if phrase_lower.startswith(tuple(self.weak_starters)) or \
-               phrase_lower.endswith(tuple(self.weak_endings)):
+            if phrase_lower.startswith(weak_starter_prefixes) or \
+               phrase_lower.endswith(weak_ending_suffixes):
                 score -= 0.15
             
             # 8. Bonus for quotes or proper names
@@ -394,42 +600,41 @@ class AnchorTextGenerator:
             score = max(0.0, min(1.0, score))
             
             # Add scored candidate to results
-            scored_candidates.append({
-                "phrase": phrase,
-                "type": candidate["type"],
-                "score": score,
-                "position": candidate.get("position", 0)
-            })
+            scored_candidates.append(candidate._replace(score=score))
         
         return scored_candidates
     
-    def _filter_anchor_candidates(self, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _dedupe_candidates(self, candidates: List[AnchorCandidate]) -> List[AnchorCandidate]:
         """
-        Filter and deduplicate anchor candidates.
+        Deduplicate anchor candidates and drop those of invalid length, before they are scored.
         """
-        # Remove duplicates (case-insensitive)
+        # Remove duplicates (case-insensitive), keeping the first occurrence
         seen_phrases = set()
         unique_candidates = []
         
         for candidate in candidates:
-            phrase_lower = candidate["phrase"].lower()
+            phrase_lower = candidate.phrase_lower
             
             # Skip if already seen or too short/long
             if phrase_lower in seen_phrases or \
-               len(candidate["phrase"]) < self.min_anchor_length or \
-               len(candidate["phrase"]) > self.max_anchor_length:
+               len(candidate.phrase) < self.min_anchor_length or \
+               len(candidate.phrase) > self.max_anchor_length:
                 continue
             
             seen_phrases.add(phrase_lower)
             unique_candidates.append(candidate)
         
-        # Sort by score (highest first)
-        unique_candidates.sort(key=lambda x: x["score"], reverse=True)
-        
-        # Return top candidates
-        return unique_candidates[:10]
+        return unique_candidates
+    
+    def _filter_anchor_candidates(self, candidates: List[AnchorCandidate]) -> List[AnchorCandidate]:
+        """
+        Select the top scored anchor candidates (already deduplicated by _dedupe_candidates).
+        """
+        # Return top candidates, sorted by score (highest first)
+        return heapq.nlargest(10, candidates, key=lambda x: x.score)
     
-    def _extract_context(self, text: str, anchor_text: str, position: int, context_length: int = 60) -> str:
+    def _extract_context(self, text: str, anchor_text: str, position: int, context_length: int = 60,
+                         text_lower: Optional[str] = None, anchor_lower: Optional[str] = None) -> str:
         """
         Extract context around an anchor text.
         
@@ -438,13 +643,19 @@ class AnchorTextGenerator:
             anchor_text: The anchor text to highlight
             position: The position of the anchor text in the source
             context_length: The total length of context to extract
+            text_lower: text.lower(), if the caller already has it
+            anchor_lower: anchor_text.lower(), if the caller already has it
             
         Returns:
             String with context and highlighted anchor text
         """
         # If position is invalid, try to find the anchor text
         if position <= 0:
-            position = text.lower().find(anchor_text.lower())
+            if text_lower is None:
+                text_lower = text.lower()
+            if anchor_lower is None:
+                anchor_lower = anchor_text.lower()
+            position = text_lower.find(anchor_lower)
             if position == -1:
                 # Handle case where the anchor text isn't found
                 return f"...{anchor_text}..."
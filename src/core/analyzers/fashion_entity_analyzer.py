@@ -11,8 +11,11 @@ This module analyzes content to extract fashion-specific entities like:
 """
 
 import re
+import hashlib
 import logging
-from typing import List, Dict, Any, Set, Tuple, Optional
+import threading
+from collections import Counter, OrderedDict
+from typing import List, Dict, Any, FrozenSet, Tuple, Optional
 import nltk
 from nltk.tokenize import word_tokenize
 from nltk.tag import pos_tag
@@ -21,12 +24,73 @@ import yaml
 import os
 from datetime import datetime
 
+try:
+    import ahocorasick # pyahocorasick: one pass over the text for every entity category
+except ImportError:
+    ahocorasick = None
+
+# Prefer PyYAML's LibYAML-backed loader; fall back to the pure-Python one if it isn't compiled in
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 # Configure logging
 logger = logging.getLogger("web_analyzer.fashion_entity_analyzer")
 
 # Define config directory relative to this file's location
 CONFIG_DIR = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'config')
 
+# Loaded term sets keyed by (absolute path, mtime), shared by every analyzer; editing a file still takes effect
+_term_set_cache: Dict[Tuple[str, float], FrozenSet[str]] = {}
+
+# Compiled patterns and entity automata keyed by the (frozen) term sets they were built from, so
+# analyzers created over the same config reuse them instead of rebuilding them
+_pattern_cache: Dict[FrozenSet[str], re.Pattern] = {}
+_automaton_cache: Dict[Tuple[FrozenSet[str], ...], Any] = {}
+
+# Number of texts whose entity matches are kept for repeat analyses
+_MATCH_CACHE_SIZE = 512
+
+# Entity categories in result order: (result key, loaded term set attribute, compiled pattern attribute)
+_ENTITY_CATEGORIES = (
+    ("clothing_items", "clothing_items", "clothing_pattern"),
+    ("brands", "fashion_brands", "brand_pattern"),
+    ("styles", "style_categories", "style_pattern"),
+    ("materials", "materials", "material_pattern"),
+    ("body_shapes", "body_shapes", "body_shape_pattern"),
+    ("colours", "colours", "colour_pattern"),
+    ("seasonal", "seasonal_terms", "seasonal_pattern"),
+)
+
+def _trie_pattern(terms: List[str]) -> str:
+    """
+    Regex alternation of the terms with shared prefixes merged, e.g. cotton|cotton canvas|corduroy
+    becomes co(?:tton(?:\\ canvas)?|rduroy). At each point the longer continuation is tried first,
+    so it matches what a longest-first alternation of the same terms would.
+    """
+    trie: Dict[str, Any] = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {} # End of a term (no character is empty)
+    
+    def emit(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if "" not in node:
+            return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # A term ends here: make the continuation optional (greedy, so the longer term is tried first)
+        return "(?:" + "|".join(branches) + ")?"
+    
+    return emit(trie)
+
+def _is_word_char(char: str) -> bool:
+    """Whether re treats a character as a word character (\\w) in a str pattern."""
+    return char.isalnum() or char == "_"
+
 class FashionEntityAnalyzer:
     """
     Analyzer for fashion-specific entities in content.
@@ -59,57 +123,179 @@ class FashionEntityAnalyzer:
         self.body_shape_pattern = self._compile_pattern(self.body_shapes, "body_shapes")
         self.colour_pattern = self._compile_pattern(self.colours, "colours")
         self.seasonal_pattern = self._compile_pattern(self.seasonal_terms, "seasonal_terms")
+        
+        # All categories in one automaton, used instead of the patterns when pyahocorasick is installed
+        self._entity_automaton = self._build_automaton() if ahocorasick is not None else None
+        
+        # Entity matches per text digest (tuples, so cached results can't be changed by callers)
+        self._match_cache: "OrderedDict[bytes, Tuple[Tuple[str, ...], ...]]" = OrderedDict()
+        self._match_cache_hits = 0
+        self._match_cache_misses = 0
+        # Bulk processing shares one analyzer between worker threads; guards the cache and its counters
+        self._match_cache_lock = threading.Lock()
         logger.info("FashionEntityAnalyzer initialized successfully.")
     
-    def _load_terms_from_yaml(self, filename: str) -> Set[str]:
+    def _load_terms_from_yaml(self, filename: str) -> FrozenSet[str]:
         """Load a set of terms from a YAML file in the config directory."""
         filepath = os.path.join(self.config_dir, filename)
         logger.debug(f"Attempting to load terms from: {filepath}")
         try:
-            with open(filepath, 'r') as f:
-                terms = yaml.safe_load(f)
+            cache_key = (os.path.abspath(filepath), os.path.getmtime(filepath))
+            term_set = _term_set_cache.get(cache_key)
+            if term_set is not None:
+                logger.debug(f"Using cached terms for {filename}")
+                return term_set
+            with open(filepath, 'rb') as f: # Binary stream: the loader detects the encoding itself
+                terms = yaml.load(f, Loader=_YamlLoader)
                 if isinstance(terms, list):
                     # Convert to lowercase set for efficient lookup and case-insensitivity
                     # Filter out None or empty strings resulting from bad YAML
-                    term_set = {str(term).lower() for term in terms if term and isinstance(term, (str, int, float))}
+                    # Frozen, since the same set is shared by every analyzer instance
+                    term_set = frozenset(str(term).lower() for term in terms if term and isinstance(term, (str, int, float)))
                     logger.info(f"Successfully loaded {len(term_set)} terms from {filename}")
+                    _term_set_cache[cache_key] = term_set
                     return term_set
                 else:
                     logger.warning(f"Expected a list in {filename}, but got {type(terms)}. Returning empty set.")
-                    return set()
+                    return frozenset()
         except FileNotFoundError:
             logger.error(f"Configuration file not found: {filepath}. Returning empty set.")
-            return set()
+            return frozenset()
         except yaml.YAMLError as e:
             logger.error(f"Error parsing YAML file {filepath}: {e}. Returning empty set.")
-            return set()
+            return frozenset()
         except Exception as e:
             logger.error(f"Unexpected error loading {filepath}: {e}. Returning empty set.")
-            return set()
+            return frozenset()
     
-    def _compile_pattern(self, terms: Set[str], category_name: str) -> Optional[re.Pattern]:
+    def _compile_pattern(self, terms: FrozenSet[str], category_name: str) -> Optional[re.Pattern]:
         """Compile regex pattern from a set of terms."""
         if not terms:
             logger.warning(f"Cannot compile pattern for '{category_name}': set of terms is empty.")
             return None
-        # Sort by length (longest first) to ensure we match the longest terms
+        compiled_pattern = _pattern_cache.get(terms)
+        if compiled_pattern is not None:
+            logger.debug(f"Using cached regex pattern for '{category_name}'.")
+            return compiled_pattern
         # Filter out any potential empty strings just in case
-        sorted_terms = sorted([term for term in terms if term], key=len, reverse=True)
-        if not sorted_terms:
+        term_list = [term for term in terms if term]
+        if not term_list:
             logger.warning(f"Cannot compile pattern for '{category_name}': term set contains only empty strings after filtering.")
             return None
-        # Escape special regex characters and join with OR
-        pattern_string = "|".join(re.escape(term) for term in sorted_terms)
+        # Escaped alternation with shared prefixes merged; it still matches the longest term first
+        pattern_string = _trie_pattern(term_list)
         # Compile pattern with word boundaries and case insensitivity
         try:
             # Added word boundaries \\b for more precise matching
             compiled_pattern = re.compile(r'\b(' + pattern_string + r')\b', re.IGNORECASE)
             logger.debug(f"Successfully compiled regex pattern for '{category_name}'.")
+            _pattern_cache[terms] = compiled_pattern
             return compiled_pattern
         except re.error as e:
             logger.error(f"Regex compilation error for '{category_name}': {e}")
             return None # Return None if compilation fails
     
+    def _build_automaton(self):
+        """Build one Aho-Corasick automaton over every category's terms, mapping each term to its categories."""
+        category_terms = tuple(frozenset(getattr(self, terms_attr)) for _, terms_attr, _ in _ENTITY_CATEGORIES)
+        if category_terms in _automaton_cache:
+            return _automaton_cache[category_terms]
+        term_categories: Dict[str, List[int]] = {}
+        for category_idx, terms in enumerate(category_terms):
+            for term in terms:
+                if term:
+                    term_categories.setdefault(term, []).append(category_idx)
+        automaton = None
+        if term_categories:
+            automaton = ahocorasick.Automaton()
+            for term, category_idxs in term_categories.items():
+                automaton.add_word(term, (len(term), tuple(category_idxs)))
+            automaton.make_automaton()
+            logger.debug(f"Built entity automaton over {len(term_categories)} terms.")
+        _automaton_cache[category_terms] = automaton
+        return automaton
+    
+    def _find_all_matches(self, text: str, text_lower: Optional[str] = None) -> Dict[str, List[str]]:
+        """
+        Find unique matches for every entity category in text, reusing the result for a text seen recently.
+        """
+        cache_key = hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        with self._match_cache_lock:
+            cached_matches = self._match_cache.get(cache_key)
+            if cached_matches is not None:
+                self._match_cache.move_to_end(cache_key)
+                self._match_cache_hits += 1
+            else:
+                self._match_cache_misses += 1
+        if cached_matches is None:
+            # Matched outside the lock so other threads aren't held up; a text matched by two threads
+            # at once is just matched twice
+            entities = self._match_entities(text, text_lower=text_lower)
+            cached_matches = tuple(tuple(entities[key]) for key, _, _ in _ENTITY_CATEGORIES)
+            with self._match_cache_lock:
+                self._match_cache[cache_key] = cached_matches
+                self._match_cache.move_to_end(cache_key)
+                if len(self._match_cache) > _MATCH_CACHE_SIZE:
+                    self._match_cache.popitem(last=False) # Evict the least recently used entry
+        return {key: list(matches) for (key, _, _), matches in zip(_ENTITY_CATEGORIES, cached_matches)}
+    
+    def get_match_cache_stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size of the entity match cache."""
+        with self._match_cache_lock:
+            return {
+                "hits": self._match_cache_hits,
+                "misses": self._match_cache_misses,
+                "size": len(self._match_cache),
+            }
+    
+    def clear_match_cache(self) -> None:
+        """Drop all cached entity matches, e.g. between batches of unrelated content."""
+        with self._match_cache_lock:
+            self._match_cache.clear()
+    
+    def _match_entities(self, text: str, text_lower: Optional[str] = None) -> Dict[str, List[str]]:
+        """
+        Find unique matches for every entity category in text.
+        
+        With the automaton this is a single pass over the lowercased text. Each category then keeps
+        the matches its compiled pattern would find: leftmost first, the longest term at a start
+        position, non-overlapping, and with word boundaries on both sides.
+        """
+        automaton = self._entity_automaton
+        if text_lower is None:
+            text_lower = text.lower() if text else ""
+        # Lowercasing can change the length of some characters, which would shift match positions
+        if automaton is None or len(text_lower) != len(text):
+            return {key: self._find_matches(getattr(self, pattern_attr), text)
+                    for key, _, pattern_attr in _ENTITY_CATEGORIES}
+        
+        def at_boundary(index: int) -> bool:
+            before = index > 0 and _is_word_char(text_lower[index - 1])
+            after = index < len(text_lower) and _is_word_char(text_lower[index])
+            return before != after
+        
+        # Longest term starting at each position, per category
+        longest: List[Dict[int, int]] = [{} for _ in _ENTITY_CATEGORIES]
+        for end_index, (length, category_idxs) in automaton.iter(text_lower):
+            start = end_index - length + 1
+            if not (at_boundary(start) and at_boundary(end_index + 1)):
+                continue
+            for category_idx in category_idxs:
+                starts = longest[category_idx]
+                if length > starts.get(start, 0):
+                    starts[start] = length
+        
+        entities = {}
+        for (key, _, _), starts in zip(_ENTITY_CATEGORIES, longest):
+            matches = {} # Insertion-ordered, like _find_matches
+            next_start = 0
+            for start in sorted(starts):
+                if start >= next_start:
+                    matches[text_lower[start:start + starts[start]]] = None
+                    next_start = start + starts[start]
+            entities[key] = list(matches)
+        return entities
+    
     def _find_matches(self, pattern: Optional[re.Pattern], text: str) -> List[str]:
         """Find unique matches for a compiled regex pattern in text."""
         if pattern is None:
@@ -119,9 +305,8 @@ class FashionEntityAnalyzer:
             return []
         try:
             # Find all matches and convert to lowercase to avoid duplicates like "Suit" and "suit"
-            # Use a set for efficient uniqueness check
-            matches = {match.group(1).lower() for match in pattern.finditer(text)}
-            return list(matches)
+            # dict.fromkeys drops duplicates while keeping matches in order of first occurrence
+            return list(dict.fromkeys(match.lower() for match in pattern.findall(text)))
         except Exception as e:
             # Log unexpected errors during regex matching
             logger.error(f"Error during regex matching: {e}")
@@ -139,17 +324,10 @@ class FashionEntityAnalyzer:
              logger.warning("Entity analysis skipped: Both content and title are empty.")
              return {"entities": {}, "primary_theme": None}
 
-        combined_text = (title.lower() if title else "") + " " + (content.lower() if content else "")
+        # One concatenation and one lowercasing pass over the combined text
+        combined_text = f"{title or ''} {content or ''}".lower()
         
-        entities = {
-            "clothing_items": self._find_matches(self.clothing_pattern, combined_text),
-            "brands": self._find_matches(self.brand_pattern, combined_text),
-            "styles": self._find_matches(self.style_pattern, combined_text),
-            "materials": self._find_matches(self.material_pattern, combined_text),
-            "body_shapes": self._find_matches(self.body_shape_pattern, combined_text),
-            "colours": self._find_matches(self.colour_pattern, combined_text),
-            "seasonal": self._find_matches(self.seasonal_pattern, combined_text)
-        }
+        entities = self._find_all_matches(combined_text, text_lower=combined_text)
         # Log counts for each category
         for category, items in entities.items():
             if items: # Only log if entities were found
@@ -173,18 +351,18 @@ class FashionEntityAnalyzer:
         # Priority: Style category mentioned in title
         title_lower = title.lower() if title else ""
         if title_lower: # Check if title exists
+             # The loaded term sets are lowercase, so checking for a known term is a set lookup
+             style_categories = self.style_categories or frozenset()
              for style in entities.get("styles", []):
                   # Check if the exact style phrase is in the title
-                  # This requires the original case potentially, let's use the loaded set
-                  # Ensure self.style_categories is not None before iterating
-                  if self.style_categories and any(s_case.lower() == style and s_case.lower() in title_lower for s_case in self.style_categories):
+                  if style in style_categories and style in title_lower:
                       logger.debug(f"Primary theme identified from title (Style): {style}")
                       return style
 
              # Priority: Clothing item mentioned in title
+             clothing_items = self.clothing_items or frozenset()
              for item in entities.get("clothing_items", []):
-                 # Ensure self.clothing_items is not None
-                 if self.clothing_items and any(i_case.lower() == item and i_case.lower() in title_lower for i_case in self.clothing_items):
+                 if item in clothing_items and item in title_lower:
                       logger.debug(f"Primary theme identified from title (Clothing): {item}")
                       return item
 
@@ -209,13 +387,12 @@ class FashionEntityAnalyzer:
         
         if dominant_category and entities.get(dominant_category):
             # Return the most frequent specific term within that dominant category
-            term_counts = {}
-            for term in entities[dominant_category]:
-                # Count occurrences in the original combined text for better frequency measure?
-                # This is simpler for now: count unique terms identified.
-                term_counts[term] = term_counts.get(term, 0) + 1 # Simple count needed here
+            # Count occurrences in the original combined text for better frequency measure?
+            # This is simpler for now: count unique terms identified (Counter tallies in C, and
+            # most_common keeps the first-listed term on ties)
+            term_counts = Counter(entities[dominant_category])
             if term_counts: # Check if term_counts is not empty
-                most_frequent_term = max(term_counts, key=term_counts.get)
+                most_frequent_term = term_counts.most_common(1)[0][0]
                 logger.debug(f"Primary theme identified by frequency in content ({dominant_category}): {most_frequent_term}")
                 return most_frequent_term
             else:
@@ -244,16 +421,8 @@ class FashionEntityAnalyzer:
             }
         
         logger.debug(f"Extracting entities from text snippet: {text[:100]}...")
-        # Find all matches using regex patterns
-        entities = {
-             "clothing_items": self._find_matches(self.clothing_pattern, text),
-             "brands": self._find_matches(self.brand_pattern, text),
-             "styles": self._find_matches(self.style_pattern, text),
-             "materials": self._find_matches(self.material_pattern, text),
-             "body_shapes": self._find_matches(self.body_shape_pattern, text),
-             "colours": self._find_matches(self.colour_pattern, text),
-             "seasonal": self._find_matches(self.seasonal_pattern, text)
-        }
+        # Find all matches for every category
+        entities = self._find_all_matches(text)
         # Log counts here as well if this method is used independently
         for category, items in entities.items():
             if items:
@@ -9,8 +9,10 @@ This module analyzes the semantic context of content to understand:
 """
 
 import re
+import heapq
 import logging
-from typing import List, Dict, Any, Tuple, Set, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, FrozenSet, Tuple, Set, Optional
 import nltk
 from nltk.tokenize import sent_tokenize, word_tokenize
 from nltk.corpus import stopwords
@@ -20,6 +22,11 @@ import numpy as np
 from collections import Counter
 import os
 
+try:
+    import ahocorasick # pyahocorasick: one pass to test a paragraph for any transition phrase
+except ImportError:
+    ahocorasick = None
+
 # --- Add NLTK path explicitly ---
 nltk_data_dir = os.getenv("NLTK_DATA", "/app/nltk_data") # Use env var or default
 if os.path.isdir(nltk_data_dir) and nltk_data_dir not in nltk.data.path:
@@ -31,6 +38,43 @@ else:
 
 logger = logging.getLogger("web_analyzer.semantic_context_analyzer")
 
+# Pre-compiled patterns (module level so they aren't looked up on every call)
+# One or more newlines; equivalent to the old r'\n\n|\n' once empty paragraphs are dropped
+_PARAGRAPH_SPLIT_RE = re.compile(r'\n+')
+
+# Common fashion-specific compound patterns
+_COMPOUND_TERM_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r'\b(?:timeless|classic|luxury|understated|quality)\s+(?:elegance|style|fashion|tailoring|pieces)\b',
+        r'\b(?:navy|khaki|oxford)\s+(?:blazer|trousers|shirt|suit)\b',
+        r'\b(?:penny|cable-knit)\s+(?:loafers|sweaters)\b',
+        r'\b(?:old money|ivy league|prep school)\s+(?:fashion|style)\b',
+        r'\b(?:well-tailored|double-breasted)\s+(?:pieces|suit)\b'
+    )
+]
+
+# Tokens per (lowercased) paragraph or query. analyze_content, find_relevant_paragraphs and
+# calculate_text_similarity re-tokenize the same paragraphs and queries; tuples so cached results
+# can't be altered by callers. Longer texts (whole documents) are tokenized without caching so the
+# cache can't hold on to them
+_TOKEN_CACHE_SIZE = 512
+_TOKEN_CACHE_MAX_CHARS = 2000
+# Max memoized lemmas per analyzer
+_LEMMA_CACHE_SIZE = 10000
+
+@lru_cache(maxsize=_TOKEN_CACHE_SIZE)
+def _cached_word_tokenize(text: str) -> Tuple[str, ...]:
+    return tuple(word_tokenize(text))
+
+@lru_cache(maxsize=16)
+def _phrase_automaton(phrases: FrozenSet[str]):
+    """Aho-Corasick automaton over the given phrases, cached since the transition phrases rarely change."""
+    automaton = ahocorasick.Automaton()
+    for phrase in phrases:
+        automaton.add_word(phrase, phrase)
+    automaton.make_automaton()
+    return automaton
+
 class SemanticContextAnalyzer:
     """
     Analyzer for understanding semantic context of content.
@@ -47,6 +91,8 @@ class SemanticContextAnalyzer:
         # If LookupError occurs here or during first use, it indicates a build/environment issue.
         self.stop_words = set(stopwords.words('english'))
         self.lemmatizer = WordNetLemmatizer()
+        # WordNet lemma per token, memoized since the same words recur across paragraphs and calls
+        self._lemmatize = lru_cache(maxsize=_LEMMA_CACHE_SIZE)(self.lemmatizer.lemmatize)
         logger.info("NLTK components (stopwords, WordNetLemmatizer) initialized.")
 
         # Extended stop words for fashion context
@@ -156,27 +202,21 @@ class SemanticContextAnalyzer:
         Returns:
             List[str]: List of preprocessed tokens
         """
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Tokenize
-        tokens = word_tokenize(text)
-        
-        # Remove stop words and short words
-        tokens = [t for t in tokens if t not in self.stop_words and len(t) > 2]
-        
-        # Remove non-alphabetic tokens
-        tokens = [t for t in tokens if t.isalpha()]
-        
-        # Lemmatize
-        tokens = [self.lemmatizer.lemmatize(t) for t in tokens]
-        
-        return tokens
+        # Tokenize the lowercased text
+        text_lower = text.lower()
+        if len(text_lower) <= _TOKEN_CACHE_MAX_CHARS:
+            tokens = _cached_word_tokenize(text_lower)
+        else:
+            tokens = word_tokenize(text_lower)
+        
+        # Remove stop words, short words and non-alphabetic tokens, then lemmatize, in one pass
+        stop_words = self.stop_words
+        return [self._lemmatize(t) for t in tokens if len(t) > 2 and t.isalpha() and t not in stop_words]
     
     def _split_into_paragraphs(self, text: str) -> List[str]:
         """Split text into paragraphs."""
         # Split by double newlines or single newlines
-        paragraphs = re.split(r'\n\n|\n', text)
+        paragraphs = _PARAGRAPH_SPLIT_RE.split(text)
         
         # Remove empty paragraphs
         paragraphs = [p.strip() for p in paragraphs if p.strip()]
@@ -219,18 +259,9 @@ class SemanticContextAnalyzer:
     
     def _find_compound_terms(self, text: str) -> List[str]:
         """Find meaningful compound terms in text."""
-        # Common fashion-specific compound patterns
-        patterns = [
-            r'\b(?:timeless|classic|luxury|understated|quality)\s+(?:elegance|style|fashion|tailoring|pieces)\b',
-            r'\b(?:navy|khaki|oxford)\s+(?:blazer|trousers|shirt|suit)\b',
-            r'\b(?:penny|cable-knit)\s+(?:loafers|sweaters)\b',
-            r'\b(?:old money|ivy league|prep school)\s+(?:fashion|style)\b',
-            r'\b(?:well-tailored|double-breasted)\s+(?:pieces|suit)\b'
-        ]
-        
         compounds = []
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
+        for pattern in _COMPOUND_TERM_PATTERNS:
+            matches = pattern.finditer(text)
             for match in matches:
                 compounds.append(match.group())
         
@@ -414,6 +445,9 @@ class SemanticContextAnalyzer:
         structure["body"] = list(range(body_start, body_end))
         
         # Identify sections by looking for topic transitions
+        transition_phrases = frozenset(phrase for phrase in self.transition_phrases if phrase)
+        transition_automaton = (_phrase_automaton(transition_phrases)
+                                if ahocorasick is not None and transition_phrases else None)
         current_section = {"start": body_start, "topic": None, "paragraphs": []}
         current_topic = None
         
@@ -424,8 +458,11 @@ class SemanticContextAnalyzer:
             # Check for section transitions
             is_transition = False
             
-            # Check for transition phrases
-            if any(phrase in para for phrase in self.transition_phrases):
+            # Check for transition phrases (one automaton pass instead of a search per phrase)
+            if transition_automaton is not None:
+                if next(transition_automaton.iter(para), None) is not None:
+                    is_transition = True
+            elif any(phrase in para for phrase in transition_phrases):
                 is_transition = True
             
             # Check for topic change
@@ -518,8 +555,5 @@ class SemanticContextAnalyzer:
             
             relevance_scores.append((i, similarity))
         
-        # Sort by similarity score (descending)
-        relevance_scores.sort(key=lambda x: x[1], reverse=True)
-        
-        # Return top N most relevant paragraphs
-        return relevance_scores[:top_n]
\ No newline at end of file
+        # Return top N most relevant paragraphs, by similarity score (descending)
+        return heapq.nlargest(top_n, relevance_scores, key=lambda x: x[1])
\ No newline at end of file
@@ -7,6 +7,7 @@ to provide comprehensive content analysis and internal linking suggestions.
 
 import os
 import json
+import heapq
 import logging
 from typing import List, Dict, Any, Tuple, Optional
 import re
@@ -15,6 +16,7 @@ import numpy as np
 # REMOVE: from sklearn.metrics.pairwise import cosine_similarity # No longer needed here
 
 # Import specialized analyzers
+from src.core.analyzer import Opportunity
 from src.core.analyzers.fashion_entity_analyzer import FashionEntityAnalyzer
 from src.core.analyzers.semantic_context_analyzer import SemanticContextAnalyzer
 from src.core.analyzers.anchor_text_generator import AnchorTextGenerator
@@ -27,6 +29,12 @@ from src.core.knowledge_db.knowledge_database import KnowledgeDatabase, global_e
 # Configure logging
 logger = logging.getLogger("web_analyzer.enhanced_analyzer")
 
+# Pre-compiled word pattern for title keyword extraction
+_WORD_RE = re.compile(r'\b\w+\b')
+
+# Paragraph separator: two or more newlines
+_PARAGRAPH_SPLIT_RE = re.compile(r'\n{2,}')
+
 # --- REMOVE UNUSED HELPER FUNCTION ---
 # def calculate_cosine_similarity(embedding1: np.ndarray, embedding2: np.ndarray) -> float:
 #    """Calculates cosine similarity between two numpy embedding vectors."""
@@ -115,11 +123,11 @@ class EnhancedContentAnalyzer:
     def _split_into_paragraphs(self, content: str) -> List[str]:
         """Split content into paragraphs."""
         if not content: return []
-        paragraphs = re.split(r'\n\n|\n{2,}', content) # Split on 2+ newlines
+        paragraphs = _PARAGRAPH_SPLIT_RE.split(content) # Split on 2+ newlines
         # Fallback to single newline if needed, but filter short lines
         if len(paragraphs) <= 1 and '\n' in content:
              paragraphs = [p for p in content.split('\n') if len(p.strip()) > 20] # Filter short lines if using single newline split
-        return [p.strip() for p in paragraphs if len(p.strip()) >= self.min_paragraph_length]
+        return [p for p in (p.strip() for p in paragraphs) if len(p) >= self.min_paragraph_length]
 
 
     def analyze_content(
@@ -231,16 +239,16 @@ class EnhancedContentAnalyzer:
 
                             if best_anchor.get("confidence", 0.0) >= self.min_confidence:
                                 logger.info(f"      Found suitable anchor: '{best_anchor['text']}' (Conf: {best_anchor['confidence']:.2f})")
-                                all_opportunities.append({
-                                    "paragraph_index": para_idx,
-                                    "target_url": target_url, # Keep as string here
-                                    "target_title": target_title,
+                                all_opportunities.append(Opportunity(
+                                    paragraph_index=para_idx,
+                                    target_url=target_url, # Keep as string here
+                                    target_title=target_title,
                                     # Use semantic similarity as the primary relevance score
-                                    "relevance": round(semantic_similarity_score, 3),
-                                    "anchor_text": best_anchor["text"],
-                                    "anchor_context": best_anchor.get("context", ""),
-                                    "anchor_confidence": round(best_anchor.get("confidence", 0.0), 2)
-                                })
+                                    relevance=round(semantic_similarity_score, 3),
+                                    anchor_text=best_anchor["text"],
+                                    anchor_context=best_anchor.get("context", ""),
+                                    anchor_confidence=round(best_anchor.get("confidence", 0.0), 2)
+                                ))
                                 # Increment count of links added for this paragraph
                                 processed_targets_for_paragraph[para_idx] = processed_targets_for_paragraph.get(para_idx, 0) + 1
                             else:
@@ -250,11 +258,13 @@ class EnhancedContentAnalyzer:
 
 
             # --- Post-process and Format Results ---
-            # Sort opportunities primarily by relevance (semantic similarity), then confidence
-            all_opportunities.sort(key=lambda x: (x["relevance"], x["anchor_confidence"]), reverse=True)
+            # Keep the best opportunities (overall suggestion limit), primarily by relevance (semantic
+            # similarity), then confidence; nlargest returns them already sorted
+            top_opportunities = heapq.nlargest(self.max_suggestions, all_opportunities,
+                                               key=lambda x: (x.relevance, x.anchor_confidence))
 
-            # Apply overall suggestion limit
-            final_suggestions = all_opportunities[:self.max_suggestions]
+            # Only the returned suggestions become dicts
+            final_suggestions = [opportunity._asdict() for opportunity in top_opportunities]
             logger.info(f"Generated {len(final_suggestions)} final link suggestions (limit: {self.max_suggestions}).")
 
             # Pass the list of dicts with string URLs to the success formatter
@@ -322,7 +332,7 @@ class EnhancedContentAnalyzer:
                  logger.warning("NLTK stopwords not found, using basic list.")
                  stop_words = {"a", "an", "the", "in", "on", "at", "for", "to", "of", "and", "or", "is", "are", "how"}
 
-            words = re.findall(r'\b\w+\b', title.lower())
+            words = _WORD_RE.findall(title.lower())
             keywords = [word for word in words if len(word) > 2 and word not in stop_words]
             logger.debug(f"Extracted keywords from title '{title}': {keywords}")
             return keywords
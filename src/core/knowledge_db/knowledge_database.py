@@ -6,6 +6,7 @@ allowing for effective internal linking suggestions between content items.
 """
 
 import os
+import heapq
 import json
 import logging
 import time
@@ -455,9 +456,8 @@ class KnowledgeDatabase:
                             "relevance": relevance
                         })
 
-                # Sort by relevance (highest first) and limit results
-                results.sort(key=lambda x: x["relevance"], reverse=True)
-                return results[:max_results]
+                # Keep the most relevant results (highest first)
+                return heapq.nlargest(max_results, results, key=lambda x: x["relevance"])
 
         except Exception as e:
             logger.error(f"Error finding related content: {str(e)}")
@@ -802,11 +802,8 @@ class KnowledgeDatabase:
                 logger.warning(f"Candidate {candidate.get('content_id')} missing valid embedding, skipping comparison.")
 
 
-        # 3. Sort by similarity (highest first)
-        results_with_scores.sort(key=lambda x: x["similarity"], reverse=True)
-
-        # 4. Return top N results
-        final_results = results_with_scores[:top_n]
+        # 3. Keep the top N results by similarity (highest first)
+        final_results = heapq.nlargest(top_n, results_with_scores, key=lambda x: x["similarity"])
         logger.info(f"Semantic search found {len(final_results)} related items above threshold {min_similarity} (returning top {top_n}).")
         return final_results
     # --- END NEW METHOD ---
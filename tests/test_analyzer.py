@@ -0,0 +1,186 @@
+"""Regression tests for ContentAnalyzer's batched relevance scoring and its caches."""
+
+import re
+
+import numpy as np
+import pytest
+import yaml
+
+import src.core.analyzer as analyzer_module
+from src.core.analyzer import ContentAnalyzer
+
+TOPIC_WEIGHTS = """
+Outerwear:
+  terms:
+    - navy blazer
+    - blazer
+    - wool coat
+    - coat
+  weight: 1.2
+Shirts:
+  terms:
+    - oxford shirt
+    - shirt
+    - button-down
+  weight: 1.0
+Footwear:
+  terms:
+    - penny loafers
+    - loafers
+    - boots
+  weight: 1.1
+"""
+
+PARAGRAPHS = [
+    "A navy blazer over an oxford shirt is the classic smart casual look for the office.",
+    "Penny loafers and boots cover most occasions, from weddings to weekend walks.",
+    "Layer a wool coat over the blazer when it gets cold, and keep the shirt simple.",
+    "This paragraph talks about nothing in the topic list at all, just the weather.",
+    "The navy blazer and oxford shirt guide explains how to wear a navy blazer well.",
+    # Hyphenated words and possessives: title phrases still match up to the "-" or "'"
+    "Our navy blazer's lining and the oxford shirt-collar guide, for penny loafers-fans.",
+    "A navy-blazer look: wool coats over button-down shirts, and choosing a wool coat’s cut.",
+]
+
+TARGETS = [
+    {"url": "https://example.com/navy-blazer", "title": "The Navy Blazer and Oxford Shirt Guide"},
+    {"url": "https://example.com/loafers", "title": "Penny Loafers: How to Wear Loafers"},
+    {"url": "https://example.com/coats", "title": "Choosing a Wool Coat"},
+    {"url": "https://example.com/misc", "title": "Notes on Nothing in Particular"},
+]
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    (config_dir / "topic_weights.yaml").write_text(TOPIC_WEIGHTS)
+    return ContentAnalyzer(config_dir=str(config_dir))
+
+
+def _baseline_relevance(topic_categories, paragraph, target_title):
+    """
+    Relevance of one paragraph/target pair as the original per-pair code scored it: substring topic
+    extraction, category-weight bonuses and a \\b-delimited search for each 2-4 word title phrase.
+    Uses only the parsed topic_weights.yaml, none of the analyzer's helpers.
+    """
+    def extract_topics(search_text):
+        topic_scores = {}
+        for data in topic_categories.values():
+            for term in data["terms"]:
+                if term.lower() in search_text:
+                    score = (data["weight"] * 0.6 + min(1.0, len(term.split()) / 5.0) * 0.3
+                             + min(1.0, len(term) / 25.0) * 0.1)
+                    topic_scores[term] = max(score, topic_scores.get(term, 0))
+        return {term.lower() for term, _ in sorted(topic_scores.items(), key=lambda x: x[1], reverse=True)[:15]}
+
+    paragraph_lower, title_lower = paragraph.lower(), target_title.lower()
+    topic_score = 0.0
+    for topic in extract_topics(paragraph_lower) & extract_topics(title_lower):
+        topic_score += 0.1 + min(0.1, (len(topic.split()) - 1) * 0.05)
+        for data in topic_categories.values():
+            if topic in {term.lower() for term in data["terms"]}:
+                topic_score += max(0, (data["weight"] - 1.0) * 0.1)
+                break
+
+    words = [w for w in title_lower.split() if len(w) > 2]
+    title_phrases = {" ".join(words[i:i + n]) for n in (2, 3, 4) for i in range(len(words) - n + 1)}
+    title_score = sum(0.1 + min(0.15, (len(phrase.split()) - 1) * 0.05) for phrase in title_phrases
+                      if re.search(r'\b' + re.escape(phrase) + r'\b', paragraph_lower))
+    return min(min(topic_score, 0.6) + min(title_score, 0.4), 1.0)
+
+
+def _relevance_matrix(analyzer, paragraphs, titles):
+    """Relevance of every paragraph/target pair from the batched scorers, as analyze_content combines them."""
+    targets = [analyzer._prepare_target(title) for title in titles]
+    paragraphs_lower = [paragraph.lower() for paragraph in paragraphs]
+    topic_scores = analyzer._batch_topic_scores(paragraphs_lower, [target[1] for target in targets])
+    title_scores = analyzer._batch_title_overlap_scores(paragraphs_lower, [target[2] for target in targets])
+    return np.minimum(np.minimum(topic_scores, 0.6) + np.minimum(title_scores, 0.4), 1.0)
+
+
+def test_relevance_matrix_matches_baseline_per_pair_scores(analyzer):
+    titles = [target["title"] for target in TARGETS[:3]]
+    topic_categories = yaml.safe_load(TOPIC_WEIGHTS)
+    expected = np.array([[_baseline_relevance(topic_categories, paragraph, title) for title in titles]
+                         for paragraph in PARAGRAPHS])
+    np.testing.assert_allclose(_relevance_matrix(analyzer, PARAGRAPHS, titles), expected)
+
+
+def test_relevance_matrix_hand_computed_scores(analyzer):
+    relevance = _relevance_matrix(analyzer, [PARAGRAPHS[0], PARAGRAPHS[5], PARAGRAPHS[6]],
+                                  ["The Navy Blazer and Oxford Shirt Guide", "Choosing a Wool Coat"])
+    np.testing.assert_allclose(relevance, [
+        # Shared navy blazer (0.17), blazer (0.12), oxford shirt (0.15) and shirt (0.1) = 0.54, plus
+        # title phrases "navy blazer" and "oxford shirt" (0.15 each); no coat topics
+        [0.84, 0.0],
+        # The same matches, ended by "'s" and "-collar"
+        [0.84, 0.0],
+        # Blazer and shirt only, as "navy-blazer" is not "navy blazer"; wool coat (0.17), coat (0.12)
+        # and the title phrase "wool coat" before "’s" (0.15), but not "choosing wool"
+        [0.22, 0.44],
+    ])
+
+
+def test_title_overlap_splits_hyphenated_and_possessive_words(analyzer):
+    titles = ["Beard Oil Routine Basics", "Navy Blazer Guide", "Men's Style Rules"]
+    paragraphs_lower = [
+        "every beard oil routine's first step is a clean face.",
+        "a navy blazer-style jacket, not navy blazers.",
+        "the men's style rules are simple; men’s style rules differ.",
+        "the navy-blazer guide.",
+    ]
+    scores = analyzer._batch_title_overlap_scores(
+        paragraphs_lower, [analyzer._build_title_phrases(title.lower()) for title in titles])
+    np.testing.assert_allclose(scores, [
+        [0.5, 0.0, 0.0], # "beard oil", "oil routine" (0.15 each) and "beard oil routine" (0.2)
+        [0.0, 0.15, 0.0], # "navy blazer" before "-style", but not inside "navy blazers"
+        [0.0, 0.0, 0.5], # "men's style", "style rules" and "men's style rules"; "men’s" is another word
+        [0.0, 0.15, 0.0], # "blazer guide" after "navy-", but not "navy blazer"
+    ])
+
+
+def test_batch_topic_scores_accepts_precomputed_terms(analyzer):
+    targets = [analyzer._prepare_target(target["title"]) for target in TARGETS[:3]]
+    paragraphs_lower = [paragraph.lower() for paragraph in PARAGRAPHS]
+    paragraphs_terms = [analyzer._scan_terms(paragraph_lower)[0] for paragraph_lower in paragraphs_lower]
+    np.testing.assert_allclose(
+        analyzer._batch_topic_scores(paragraphs_lower, [target[1] for target in targets], paragraphs_terms=paragraphs_terms),
+        analyzer._batch_topic_scores(paragraphs_lower, [target[1] for target in targets]))
+
+
+def test_result_cache_returns_equal_fresh_results(analyzer):
+    content = "\n\n".join(PARAGRAPHS)
+    first = analyzer.analyze_content(content, "Smart Casual Basics", TARGETS)
+    assert first
+    first[0]["anchor_text"] = "changed by the caller"
+
+    second = analyzer.analyze_content(content, "Smart Casual Basics", TARGETS)
+    assert second[0]["anchor_text"] != "changed by the caller"
+    assert analyzer.get_result_cache_stats() == {"hits": 1, "misses": 1, "size": 1}
+
+    analyzer._result_cache.clear()
+    assert analyzer.analyze_content(content, "Smart Casual Basics", TARGETS) == second
+
+
+def test_result_cache_evicts_least_recently_used(analyzer, monkeypatch):
+    monkeypatch.setattr(analyzer_module, "_RESULT_CACHE_SIZE", 2)
+    content = "\n\n".join(PARAGRAPHS)
+    for title in ("A", "B", "A", "C"): # "A" is used again before "C", so "B" is evicted
+        analyzer.analyze_content(content, title, TARGETS)
+    assert analyzer.get_result_cache_stats() == {"hits": 1, "misses": 3, "size": 2}
+
+    analyzer.analyze_content(content, "A", TARGETS)
+    analyzer.analyze_content(content, "B", TARGETS)
+    assert analyzer.get_result_cache_stats() == {"hits": 2, "misses": 4, "size": 2}
+
+
+def test_target_cache_reuses_and_evicts_targets(analyzer, monkeypatch):
+    monkeypatch.setattr(analyzer_module, "_TARGET_CACHE_SIZE", 2)
+    first = analyzer._prepare_target(TARGETS[0]["title"])
+    assert analyzer._prepare_target(TARGETS[0]["title"]) is first
+    assert analyzer._prepare_target(TARGETS[3]["title"]) is None # Cached even without topics
+
+    analyzer._prepare_target(TARGETS[1]["title"])
+    assert list(analyzer._target_cache) == [TARGETS[3]["title"], TARGETS[1]["title"]]
+    assert analyzer._prepare_target(TARGETS[0]["title"]) == first
@@ -0,0 +1,52 @@
+"""Regression tests for AnchorTextGenerator's tokenizing shortcuts."""
+
+import re
+
+import nltk
+import nltk.tokenize
+import pytest
+
+from src.core.analyzers.anchor_text_generator import _cached_phrase_tokenize
+
+
+def _has_punkt():
+    try:
+        nltk.data.find("tokenizers/punkt")
+    except LookupError:
+        return False
+    return True
+
+
+@pytest.fixture(autouse=True)
+def clear_phrase_cache():
+    _cached_phrase_tokenize.cache_clear()
+    yield
+    _cached_phrase_tokenize.cache_clear()
+
+
+@pytest.mark.skipif(not _has_punkt(), reason="needs the NLTK punkt data")
+@pytest.mark.parametrize("text", [
+    "Summer Dress Tips. A Guide",
+    "Summer Dress Tips.",
+    "Dr. Martens Boots Explained",
+    "Is It Worth It? A Review",
+    "Men's Style Guide",
+    "navy blazer",
+])
+def test_phrase_tokens_match_word_tokenize(text):
+    assert _cached_phrase_tokenize(text) == tuple(nltk.word_tokenize(text))
+
+
+def test_mid_phrase_period_is_split_off(monkeypatch):
+    # Stand-in for Punkt (whose data may not be installed) that ends a sentence after ". "
+    calls = []
+
+    def fake_sent_tokenize(text, language="english"):
+        calls.append(text)
+        return re.split(r"(?<=\.)\s+", text)
+
+    monkeypatch.setattr(nltk.tokenize, "sent_tokenize", fake_sent_tokenize)
+    assert _cached_phrase_tokenize("Summer Dress Tips. A Guide") == ("Summer", "Dress", "Tips", ".", "A", "Guide")
+    assert _cached_phrase_tokenize("Men's Summer Dress Tips") == ("Men", "'s", "Summer", "Dress", "Tips")
+    # Only the phrase with a sentence-ending character went through the sentence split
+    assert calls == ["Summer Dress Tips. A Guide"]
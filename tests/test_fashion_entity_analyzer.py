@@ -0,0 +1,156 @@
+"""Regression tests for FashionEntityAnalyzer's entity matching and match cache."""
+
+import random
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import src.core.analyzers.fashion_entity_analyzer as fashion_module
+from src.core.analyzers.fashion_entity_analyzer import FashionEntityAnalyzer, _ENTITY_CATEGORIES, _trie_pattern
+
+# Overlapping terms (shared prefixes, terms inside longer terms, a term in two categories) and
+# terms with non-word characters, so longest-match, overlap and word-boundary rules all matter
+ENTITY_TERMS = {
+    "clothing_items.yaml": ["shirt", "oxford shirt", "t-shirt", "blazer", "navy blazer", "suit", "suit jacket", "coat"],
+    "fashion_brands.yaml": ["H&M", "Ralph Lauren", "Polo", "Polo Ralph Lauren"],
+    "style_categories.yaml": ["preppy", "smart casual", "casual"],
+    "materials.yaml": ["wool", "merino wool", "cotton", "oxford"],
+    "body_shapes.yaml": ["athletic", "slim"],
+    "colours.yaml": ["navy", "navy blue", "blue", "grey"],
+    "seasonal_terms.yaml": ["summer", "winter", "autumn/winter"],
+}
+
+SAMPLE_TEXTS = [
+    "A navy blazer over an Oxford shirt is smart casual; a T-shirt is just casual.",
+    "Polo Ralph Lauren and H&M both sell merino wool suits, and a suit jacket in navy blue.",
+    "Navy, navy blue and NAVY BLAZER: repeated terms keep the order of their first match.",
+    "The shirts and blazers here are plurals, so only the coat-rack's coat matches.",
+    "Autumn/winter brings wool coats; summer brings cotton t-shirts for athletic builds.",
+    "suitjacket, _shirt and shirt_ are not whole words; (slim) and \"grey\" are.",
+    "",
+]
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    for filename, terms in ENTITY_TERMS.items():
+        (tmp_path / filename).write_text("\n".join(f"- {term}" for term in terms) + "\n")
+    return FashionEntityAnalyzer(config_dir=str(tmp_path))
+
+
+def _flat_pattern(terms):
+    """Longest-first alternation of the escaped terms, as the category patterns were compiled before."""
+    alternation = "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+    return re.compile(r'\b(' + alternation + r')\b', re.IGNORECASE)
+
+
+def _regex_matches(analyzer, text):
+    return {key: analyzer._find_matches(getattr(analyzer, pattern_attr), text)
+            for key, _, pattern_attr in _ENTITY_CATEGORIES}
+
+
+@pytest.mark.parametrize("text", SAMPLE_TEXTS)
+def test_automaton_matches_regex(analyzer, text):
+    pytest.importorskip("ahocorasick")
+    assert analyzer._entity_automaton is not None
+    assert analyzer._match_entities(text) == _regex_matches(analyzer, text)
+
+
+def test_automaton_keeps_longest_leftmost_matches(analyzer):
+    pytest.importorskip("ahocorasick")
+    entities = analyzer._match_entities(SAMPLE_TEXTS[1])
+    assert entities["brands"] == ["polo ralph lauren", "h&m"]
+    assert entities["clothing_items"] == ["suit jacket"]
+    assert entities["materials"] == ["merino wool"]
+    assert entities["colours"] == ["navy blue"]
+
+
+def test_length_changing_lowercase_falls_back_to_regex(analyzer, monkeypatch):
+    # "İ" lowercases to two characters, so automaton positions in the lowercased text would be off
+    text = "İstanbul edit: a navy blazer with an oxford shirt for winter."
+    assert len(text.lower()) != len(text)
+
+    class NoAutomaton:
+        def iter(self, text):
+            raise AssertionError("the automaton must not be used when lowercasing changes the length")
+
+    monkeypatch.setattr(analyzer, "_entity_automaton", NoAutomaton())
+    entities = analyzer._match_entities(text)
+    assert entities == _regex_matches(analyzer, text)
+    assert entities["clothing_items"] == ["navy blazer", "oxford shirt"]
+    assert entities["seasonal"] == ["winter"]
+
+
+def test_trie_pattern_prefers_longer_terms_and_backtracks():
+    pattern = re.compile(r'\b(' + _trie_pattern(["cotton", "cotton canvas", "corduroy", "co"]) + r')\b')
+    # "cotton canvases" backtracks to "cotton" when the \b after "cotton canvas" fails
+    assert pattern.findall("co cotton cotton canvas cotton canvases corduroys corduroy") == [
+        "co", "cotton", "cotton canvas", "cotton", "corduroy"]
+
+
+@pytest.mark.parametrize("text", SAMPLE_TEXTS)
+def test_trie_patterns_match_flat_alternations(analyzer, text):
+    for _, terms_attr, pattern_attr in _ENTITY_CATEGORIES:
+        assert getattr(analyzer, pattern_attr).findall(text) == _flat_pattern(getattr(analyzer, terms_attr)).findall(text)
+
+
+def test_trie_patterns_match_flat_alternations_on_shipped_terms():
+    analyzer = FashionEntityAnalyzer()
+    all_terms = sorted({term for _, terms_attr, _ in _ENTITY_CATEGORIES for term in getattr(analyzer, terms_attr)})
+    assert all_terms
+    # Every shipped term, some glued to suffixes or other terms so word boundaries and backtracking matter
+    separators = [" ", ", ", "-", "'s ", "s ", " and ", ""]
+    text = "".join(term.title() + separators[i % len(separators)] for i, term in enumerate(all_terms))
+    for _, terms_attr, pattern_attr in _ENTITY_CATEGORIES:
+        pattern = getattr(analyzer, pattern_attr)
+        if pattern is not None:
+            assert pattern.findall(text) == _flat_pattern(getattr(analyzer, terms_attr)).findall(text)
+
+
+def test_match_cache_hits_and_eviction(analyzer, monkeypatch):
+    monkeypatch.setattr(fashion_module, "_MATCH_CACHE_SIZE", 2)
+    first, second, third = SAMPLE_TEXTS[:3]
+
+    matches = analyzer._find_all_matches(first)
+    matches["clothing_items"].append("changed by the caller")
+    assert analyzer._find_all_matches(first) == analyzer._match_entities(first)
+
+    analyzer._find_all_matches(second)
+    analyzer._find_all_matches(first) # Most recently used again, so "second" is evicted next
+    analyzer._find_all_matches(third)
+    assert analyzer.get_match_cache_stats() == {"hits": 2, "misses": 3, "size": 2}
+
+    analyzer._find_all_matches(first)
+    analyzer._find_all_matches(second)
+    assert analyzer.get_match_cache_stats() == {"hits": 3, "misses": 4, "size": 2}
+
+    analyzer.clear_match_cache()
+    assert analyzer.get_match_cache_stats()["size"] == 0
+
+
+def test_match_cache_is_safe_across_threads(analyzer, monkeypatch):
+    class YieldingCache(OrderedDict):
+        """Yields to other threads after each lookup, so hits reliably race with evictions."""
+        def get(self, key, default=None):
+            value = super().get(key, default)
+            time.sleep(0)
+            return value
+
+    # A tiny cache shared by many threads, as in bulk processing
+    monkeypatch.setattr(fashion_module, "_MATCH_CACHE_SIZE", 2)
+    texts = [(f"Look {i}: a navy blazer and an oxford shirt", "Smart casual") for i in range(3)]
+    expected = [analyzer.analyze_content(content, title) for content, title in texts]
+    analyzer._match_cache = YieldingCache()
+    rng = random.Random(0)
+    calls = [rng.randrange(len(texts)) for _ in range(2000)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda i: analyzer.analyze_content(*texts[i]), calls))
+
+    assert results == [expected[i] for i in calls]
+    stats = analyzer.get_match_cache_stats()
+    assert stats["hits"] + stats["misses"] == len(texts) + len(calls)
+    assert stats["size"] <= 2